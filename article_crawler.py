@@ -1,107 +1,331 @@
 import os
+import re
+import math
 import time
+import asyncio
 import json
-import requests
+import queue
+import tempfile
+import threading
 from tqdm import tqdm
-from urllib.parse import urlparse
-from bs4 import BeautifulSoup
-from requests.adapters import HTTPAdapter
-from urllib3.poolmanager import PoolManager
-import ssl
-from playwright.sync_api import sync_playwright
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from concurrent.futures import ThreadPoolExecutor
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from browser_pool import BrowserPool
+from resource_policy import ResourcePolicy, RequestCounter
+from comment_tree import CommentTree
+from html_parser import make_soup
+from http_client import get_session
+from http_cache import get_cache
+from rate_limiter import get_limiter
+from async_request_sender import fetch_text, get_engine, make_async_client
+from retry_policy import (
+    DEFAULT_ARTICLE_RETRIES, DEFAULT_MAX_ATTEMPTS, DEFAULT_RETRY_BACKOFF, PERMANENT,
+    backoff_delay, classify_failure, max_attempts_for
+)
+from media_downloader import DEFAULT_MEDIA_WORKERS, MediaDownloader, media_items
 from pathlib import Path
-import logging
-from datetime import datetime
 from logger_config import get_logger
 
 
-class TLSAdapter(HTTPAdapter):
-    def init_poolmanager(self, connections, maxsize, block=False):
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        ctx.minimum_version = ssl.TLSVersion.TLSv1_2
-        self.poolmanager = PoolManager(
-            num_pools=connections,
-            maxsize=maxsize,
-            block=block,
-            ssl_context=ctx
-        )
-
-session = requests.Session()
-session.mount("https://", TLSAdapter())
+PAGE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+# Paragraphs starting with any of these are captions/credits/cross-links, not body text.
+CONTENT_BAD_PREFIXES = ("Ảnh:", "Nguồn:", "Video:", "Xem thêm:", "Đọc thêm:", "TTO -")
+
+AUDIO_SELECTOR = "audio"
+REACTINFO_SELECTOR = "#main-detail > div.sendstarauthor > div > div > div.reactinfo"
+REACTION_SELECTORS = {
+    "star": "span:nth-child(2) > span",
+    "like": "span:nth-child(3) > span",
+    "love": "span:nth-child(4) > span"
+}
+
+# Static-HTML audio discovery: direct <audio> tags, data-* attributes on
+# player placeholders, and audio URLs embedded in inline scripts.
+AUDIO_URL_RE = re.compile(r"https?://[^\s\"'<>]+?\.(?:mp3|m4a|aac|ogg)(?:\?[^\s\"'<>]*)?", re.I)
+AUDIO_DATA_ATTRS = ["data-src", "data-file", "data-audio", "data-url"]
+AUDIO_DATA_SELECTOR = ", ".join(f"[{attr}]" for attr in AUDIO_DATA_ATTRS)
+AUDIO_PLACEHOLDER_SELECTOR = "audio, [class*='audio'], [id*='audio'], [data-audio]"
+
+# Put once per worker into a crawl_stream queue to tell it discovery is over.
+STREAM_END = None
+
+# Upper bound on the readiness wait after DOMContentLoaded (seconds), and how
+# long the network must be quiet before the page counts as idle (ms).
+READY_TIMEOUT = 5
+NETWORK_IDLE_MS = 500
+
+# Resolves (truthy) once audio + reactinfo are present, or once the page has
+# loaded and no resource finished within the last NETWORK_IDLE_MS.
+READY_SCRIPT = """([audioSel, reactSel, idleMs]) => {
+    const audio = document.querySelector(audioSel + '[src]');
+    const react = document.querySelector(reactSel);
+    if (audio && react) return 'dom';
+    if (document.readyState !== 'complete') return false;
+    const ends = performance.getEntriesByType('resource').map(e => e.responseEnd);
+    const last = Math.max(performance.timing.loadEventEnd - performance.timeOrigin, ...ends);
+    return performance.now() - last >= idleMs ? 'idle' : false;
+}"""
+
+DEFAULT_BASE_URL = "https://tuoitre.vn"
+
+COMMENT_API_URL = "https://id.tuoitre.vn/api/getlist-comment.api"
+COMMENT_APP_KEY = "lHLShlUMAshjvNkHmBzNqERFZammKUXB1DjEuXKfWAwkunzW6fFbfrhP/FIG0Xwp7aPwhwIuucLW1TVC9lzmUoA=="
+# Keys the comment API may use to report the total number of comments.
+COMMENT_TOTAL_KEYS = ["TotalCount", "Total", "TotalComment", "total", "totalCount"]
+COMMENT_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json, text/plain, */*",
+    "Referer": "https://tuoitre.vn/",
+    "Origin": "https://tuoitre.vn"
+}
 
 class ArticleCrawler:
-    def __init__(self, data_dir='data'):
-        self.playwright = None
-        self.browser = None
-        self.page = None
+    def __init__(self, data_dir='data', use_browser=True, reaction_api_url=None,
+                 comment_workers=4, max_comment_pages=None, state=None, base_url=None,
+                 media_workers=DEFAULT_MEDIA_WORKERS, defer_media=False, article_retries=DEFAULT_ARTICLE_RETRIES,
+                 retry_backoff=DEFAULT_RETRY_BACKOFF, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.browser_pool = None
+        # Site root; anything other than tuoitre.vn (e.g. mock_server.py) also
+        # serves the comment API itself under /api/.
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        if self.base_url == DEFAULT_BASE_URL:
+            self.comment_api_url = COMMENT_API_URL
+        else:
+            self.comment_api_url = f"{self.base_url}/api/getlist-comment.api"
+        self.comment_headers = {**COMMENT_HEADERS, "Referer": self.base_url + "/", "Origin": self.base_url}
+        # Shared keep-alive pool (http_client); safe to use from every worker thread.
+        self.session = get_session()
+        self.use_browser = use_browser
+        # Optional JSON endpoint for article reactions, e.g. ".../reactions?id={post_id}".
+        self.reaction_api_url = reaction_api_url
+        # Concurrent comment-page requests per article, and an optional page cap.
+        self.comment_workers = comment_workers
+        self.max_comment_pages = max_comment_pages
+        # Optional CrawlState; when set, every article outcome is recorded there.
+        self.state = state
         self.data_dir = Path(data_dir)
-        self.image_dir = self.data_dir / "images"
-        self.audio_dir = self.data_dir / "audio"
+        # Images and audio are stored once per content hash under data/media.
+        self.media_dir = self.data_dir / "media"
+        self.media = MediaDownloader(self.media_dir, session=self.session, workers=media_workers, state=state)
+        # With a CrawlState, queue media there instead of downloading before the JSON is saved.
+        self.defer_media = defer_media and state is not None
+        # In-run retries of a failed article (see retry_policy), with jittered
+        # exponential backoff; `max_attempts` caps tries per URL over all runs.
+        self.article_retries = article_retries
+        self.retry_backoff = retry_backoff
+        self.max_attempts = max_attempts
+        self.log_dir = Path("logs")
+        self._failed_lock = threading.Lock()
+        self.async_client = None
         self.logger = get_logger("ArticleCrawler")
 
-    def start_browser(self, headless=True):
-        """Start a single Playwright browser session."""
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(headless=headless)
-        self.page = self.browser.new_page()
+    def start_browser(self, headless=True, pool_size=1, recycle_after=200, resource_policy=None):
+        """
+        Start a pool of Playwright browser sessions for JS-dependent extraction.
+
+        `resource_policy` defaults to ResourcePolicy(), which blocks images,
+        media, fonts, stylesheets and known ad/tracker domains.
+        """
+        self.browser_pool = BrowserPool(
+            size=pool_size,
+            headless=headless,
+            recycle_after=recycle_after,
+            resource_policy=resource_policy or ResourcePolicy()
+        )
 
     def stop_browser(self):
-        """Safely close Playwright browser."""
-        if self.page:
-            self.page.close()
-        if self.browser:
-            self.browser.close()
-        if self.playwright:
-            self.playwright.stop()
-
-    def crawl_articles(self, posts: dict, finished_url: set):
+        """Safely close every browser in the pool."""
+        if self.browser_pool:
+            self.browser_pool.close()
+        self.browser_pool = None
+
+    def crawl_articles(self, posts: dict, finished_url: set, workers=1):
+        """
+        Crawl every article in `posts` that is not in `finished_url`.
+
+        With workers > 1 the worker threads pull URLs from a shared queue
+        and borrow pages from the browser pool for JS-dependent steps.
+        Finished URLs are added to `finished_url` as soon as their JSON
+        file is written.
+        """
+        jobs = queue.Queue()
+        seen = set()
+        total = 0
         for category, data in posts.items():
             if category == "Video":
                 continue
             urls = data.get("articles", [])
-            print(f"[INFO] Started crawling category {category} with {len(urls)} articles")
-            loop = tqdm(urls, leave=True)
-
+            print(f"[INFO] Queued category {category} with {len(urls)} articles")
             self.logger.info(f"Started crawling category: {category} | Articles: {len(urls)}")
 
-            for url in loop:
+            for url in urls:
                 if url in finished_url:
                     self.logger.info(f"The url {url} has been crawled. Skipping.")
                     continue
+                # An article listed in several categories is crawled once.
+                if url in seen:
+                    continue
+                seen.add(url)
+                jobs.put((category, url))
+                total += 1
+
+        if total == 0:
+            return
+
+        loop = tqdm(total=total, leave=True)
+        lock = threading.Lock()
+
+        # The calling thread is worker 0. Workers share the browser pool, so
+        # a pool smaller than `workers` just means some of them queue for a page.
+        threads = [
+            threading.Thread(
+                target=self._crawl_worker,
+                args=(jobs, finished_url, loop, lock),
+                name=f"ArticleWorker-{i}",
+                daemon=True
+            )
+            for i in range(1, min(workers, total))
+        ]
+        for t in threads:
+            t.start()
+        try:
+            self._crawl_worker(jobs, finished_url, loop, lock)
+        finally:
+            for t in threads:
+                t.join()
+            loop.close()
+
+    def crawl_stream(self, jobs, finished_url, workers=1):
+        """
+        Crawl (category, url) jobs from `jobs` while a producer is still
+        filling it. Each worker stops at a STREAM_END, so the producer puts
+        one per worker once it is done.
+        """
+        loop = tqdm(leave=True)
+        lock = threading.Lock()
+
+        threads = [
+            threading.Thread(
+                target=self._crawl_worker,
+                args=(jobs, finished_url, loop, lock, True),
+                name=f"ArticleWorker-{i}",
+                daemon=True
+            )
+            for i in range(1, workers)
+        ]
+        for t in threads:
+            t.start()
+        try:
+            self._crawl_worker(jobs, finished_url, loop, lock, True)
+        finally:
+            for t in threads:
+                t.join()
+            loop.close()
+
+    def _crawl_worker(self, jobs, finished_url, loop, lock, stream=False):
+        """Pull (category, url) jobs until the queue is empty (or, streaming, until STREAM_END)."""
+        while True:
+            if stream:
+                job = jobs.get()
+                if job is STREAM_END:
+                    break
+            else:
                 try:
-                    soup = self.send_request(url)
-                    post_data = self.extract_post_data(soup, url, category=category)
-                    post_id = post_data["postId"]
-
-                    post_data["images"] = self.download_images(post_id, post_data["images"])
-                    post_data["audio_podcast"] = self.download_audio(post_id, post_data["audio_podcast"])
-                    self.save_post_json(post_data)
-                    self.logger.info(f"Saved article {post_id}")
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    break
+            category, url = job
+
+            post_id = self.crawl_article(url, category)
+            with lock:
+                if post_id is not None:
+                    finished_url.add(url)
                     loop.set_description(f"✅ Saved {post_id}")
+                loop.update(1)
+
+    def crawl_article(self, url, category):
+        """
+        Fetch, extract, download (or queue) media and save a single article. Returns the postId or None.
+
+        Retryable failures are tried again here after a jittered backoff; the
+        final failure is recorded with its class and the time of the next
+        attempt, so later rounds and runs only retry what can succeed.
+        """
+        attempt = 0
+        previous = None
+        while True:
+            attempt += 1
+            try:
+                post_id = self._crawl_once(url, category)
+                if self.state:
+                    self.state.mark_done(url, post_id, category, attempts=attempt)
+                self.logger.info(f"Saved article {post_id}")
+                return post_id
+
+            except Exception as e:
+                kind = classify_failure(e)
+                if previous is None:
+                    previous = self.state.attempts(url) if self.state else 0
+                if (
+                    kind != PERMANENT
+                    and attempt <= self.article_retries
+                    and previous + attempt < max_attempts_for(kind, self.max_attempts)
+                ):
+                    delay = backoff_delay(attempt, self.retry_backoff)
+                    self.logger.warning(f"Retrying article in {delay:.1f}s ({kind}, attempt {attempt}): {url} | {e}")
+                    time.sleep(delay)
+                    continue
+
+                self.logger.error(f"Failed crawling article ({kind}): {url}", exc_info=True)
+                if self.state:
+                    self.state.mark_failed(
+                        url, str(e), category,
+                        attempts=attempt,
+                        failure_kind=kind,
+                        next_attempt_at=time.time() + backoff_delay(previous + attempt, self.retry_backoff)
+                    )
+                self.log_failed_url(url, f"{kind}: {e}")
+                return None
 
-                except Exception as e:
-                    self.logger.error(f"Failed crawling article: {url}", exc_info=True)
-                    self.log_failed_url(url, str(e))
+    def _crawl_once(self, url, category):
+        soup = self.send_request(url)
+        post_data = self.extract_post_data(soup, url, category=category)
+        post_id = post_data["postId"]
+
+        if self.defer_media:
+            self.save_post_json(post_data)
+            self.state.enqueue_media(post_id, media_items(post_data))
+        else:
+            post_data["images"] = self.download_images(post_id, post_data["images"])
+            post_data["audio_podcast"] = self.download_audio(post_id, post_data["audio_podcast"])
+            self.save_post_json(post_data)
+        return post_id
 
 
     def send_request(self, url):
+        engine = get_engine()
+        if engine:
+            return engine.run(self.async_send_request(url))
+
         self.logger.debug(f"Fetching URL: {url}")
+        cache = get_cache()
         try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            }
-            r = session.get(url, headers=headers, timeout=15)
-            r.raise_for_status()
+            if cache:
+                text = cache.fetch_text(self.session, url, headers=PAGE_HEADERS, timeout=15)
+            else:
+                r = self.session.get(url, headers=PAGE_HEADERS, timeout=15)
+                r.raise_for_status()
+                text = r.text
 
         except Exception:
             self.logger.error(f"Request failed: {url}", exc_info=True)
             raise
 
-        return BeautifulSoup(r.text, "html.parser")
+        return make_soup(text)
 
     def extract_post_data(self, soup, url, category):
         post_id = self.extract_post_id(url)
@@ -110,9 +334,8 @@ class ArticleCrawler:
         date = self.extract_date(soup)
         author = self.extract_author(soup)
         content = self.extract_content(soup)
-        audio_urls = self.extract_audio_urls(url)
         images = self.extract_images(soup)
-        reactions = self.extract_reactions(url=url, wait_time=10)
+        audio_urls, reactions = self.extract_audio_and_reactions(soup, url, post_id)
 
         return {
             "postId": post_id,
@@ -143,38 +366,38 @@ class ArticleCrawler:
         author = soup.select_one("div.author-info a")
         return author.text.strip() if author else "Tuoi Tre"
 
-    def extract_content(self, soup):
+    def extract_content(self, soup, structured=False):
+        """
+        Article body text, one cleaned paragraph per line.
+
+        Single pass over the <p> tags of the first div.detail-cmain. With
+        structured=True returns [{"text", "start", "end"}] instead, where
+        start/end are offsets of each paragraph in the joined text.
+        """
         container = soup.select_one("div.detail-cmain")
         if not container:
-            return ""
-
-        allowed_selectors = [
-            "div#main-detail-body p",
-            "div.detail-cmain p",
-            "div#article-body p",
-            "div.article-content p",
-            "div.content p"
-        ]
-        allowed_paragraphs = set()
-        for sel in allowed_selectors:
-            allowed_paragraphs.update(soup.select(sel))
+            return [] if structured else ""
 
         cleaned = []
         for p in container.select("p"):
-            if p not in allowed_paragraphs:
-                continue
             if p.has_attr("data-placeholder"):
                 continue
             if "VCObjectBoxRelatedNewsItemSapo" in p.get("class", []):
                 continue
             text = p.get_text(strip=True)
-            if not text:
-                continue
-            bad_patterns = ["Ảnh:", "Nguồn:", "Video:", "Xem thêm:", "Đọc thêm:", "TTO -"]
-            if any(text.startswith(bp) for bp in bad_patterns):
+            if not text or text.startswith(CONTENT_BAD_PREFIXES):
                 continue
             cleaned.append(text)
-        return "\n".join(cleaned)
+
+        if not structured:
+            return "\n".join(cleaned)
+
+        paragraphs = []
+        offset = 0
+        for text in cleaned:
+            paragraphs.append({"text": text, "start": offset, "end": offset + len(text)})
+            offset += len(text) + 1
+        return paragraphs
 
     def extract_images(self, soup):
         """
@@ -200,164 +423,444 @@ class ArticleCrawler:
 
 
     def extract_comments_api(self, post_id):
-        url = "https://id.tuoitre.vn/api/getlist-comment.api"
-        params = {
-            "pageindex": 1,
+        engine = get_engine()
+        if engine:
+            return engine.run(self.async_extract_comments_api(post_id))
+
+        tree = CommentTree()
+        for items in self.iter_comment_pages(post_id):
+            CommentTree.from_api_items(items, tree)
+        return self._comments_json(post_id, tree)
+
+    def _comments_json(self, post_id, tree):
+        self.logger.info(f"Comments for {post_id}: {len(tree)} | depth {tree.max_depth}")
+        return tree.to_json()
+
+    def iter_comment_pages(self, post_id):
+        """
+        Yield the raw API items of each comment page, in page order.
+
+        Page 1 is fetched alone. If it reports a total, the remaining pages
+        are fetched concurrently (at most `comment_workers` in flight);
+        otherwise pages are fetched in windows of `comment_workers` until an
+        empty page is seen. Never goes past `max_comment_pages`.
+        """
+        first = self._fetch_comment_page(post_id, 1)
+        if not first:
+            return
+        items, data = first
+        yield items
+
+        max_pages = self.max_comment_pages or float("inf")
+        total = self._comment_total(data)
+        if total is not None:
+            last_page = min(max_pages, math.ceil(total / len(items)))
+        else:
+            last_page = max_pages
+
+        with ThreadPoolExecutor(max_workers=self.comment_workers) as executor:
+            page = 2
+            while page <= last_page:
+                window = range(page, int(min(last_page, page + self.comment_workers - 1)) + 1)
+                for result in executor.map(lambda p: self._fetch_comment_page(post_id, p), window):
+                    if not result:
+                        return
+                    yield result[0]
+                page = window.stop
+
+    def _fetch_comment_page(self, post_id, page):
+        """
+        Returns (API items, raw payload), or None when the page is empty.
+        HTTP and connection errors are raised, so a failing page fails the
+        article (and gets it retried) instead of silently ending the comments.
+        """
+        try:
+            r = self.session.get(
+                self.comment_api_url,
+                params=self._comment_params(post_id, page),
+                headers=self.comment_headers,
+                timeout=15
+            )
+            r.raise_for_status()
+            data = r.json()
+        except Exception:
+            self.logger.error(f"Comment API failed: {post_id} page {page}", exc_info=True)
+            raise
+        items = self._parse_comment_page(data)
+        if not items:
+            return None
+        return items, data
+
+    def _comment_total(self, data):
+        for key in COMMENT_TOTAL_KEYS:
+            value = data.get(key)
+            if isinstance(value, (int, str)) and str(value).isdigit():
+                return int(value)
+        return None
+
+    def _comment_params(self, post_id, page):
+        return {
+            "pageindex": page,
             "objId": str(post_id),
             "objType": 1,
             "objectpopupid": "",
             "sort": 2,
             "commentid": "",
             "command": "",
-            "appKey": "lHLShlUMAshjvNkHmBzNqERFZammKUXB1DjEuXKfWAwkunzW6fFbfrhP/FIG0Xwp7aPwhwIuucLW1TVC9lzmUoA=="
-        }
-        headers = {
-            "User-Agent": "Mozilla/5.0",
-            "Accept": "application/json, text/plain, */*",
-            "Referer": "https://tuoitre.vn/",
-            "Origin": "https://tuoitre.vn"
+            "appKey": COMMENT_APP_KEY
         }
 
-        all_comments = []
-
-        def process_comment(item):
-            """Recursively process a comment and its child_comments."""
-            reactions = item.get("reactions", {})
-            child_comments = item.get("child_comments") or []
-
-            # Process child comments first
-            replies = [process_comment(reply) for reply in child_comments]
-
-            return {
-                "commentId": item.get("id"),
-                "author": item.get("sender_fullname"),
-                "text": item.get("content"),
-                "date": item.get("published_date"),
-                "vote_reactions": {
-                    "like": reactions.get("1", 0),
-                    "love": reactions.get("3", 0),
-                    "wow": reactions.get("5", 0),
-                    "sad": reactions.get("7", 0),
-                    "angry": reactions.get("9", 0)
-                },
-                "replies": replies  # nested child comments
-            }
-
-        page = 1
-        while True:
-            params["pageindex"] = page
-            try:
-                r = requests.get(url, params=params, headers=headers, timeout=15)
-                if r.status_code != 200:
-                    break
-                data = r.json()
-                page_data = json.loads(data.get("Data", "[]"))
-                if not page_data:
-                    break
+    def _parse_comment_page(self, data):
+        """Raw comment API items of one JSON payload (replies still nested in child_comments)."""
+        return json.loads(data.get("Data", "[]"))
 
-                for item in page_data:
-                    all_comments.append(process_comment(item))
+    def extract_audio_and_reactions(self, soup, url, post_id):
+        """
+        HTTP-only extraction first; the browser is only used for whatever the
+        static HTML / reaction API could not answer, and never when
+        use_browser is False.
+        """
+        audio_urls = self.extract_static_audio(soup)
+        reactions = self.extract_static_reactions(soup, post_id)
+
+        if audio_urls is None or reactions is None:
+            if self.use_browser:
+                self.logger.info(
+                    f"Static extraction miss (audio={audio_urls is not None}, "
+                    f"reactions={reactions is not None}), using browser: {url}"
+                )
+                browser_audio, browser_reactions = self.extract_browser_data(url)
+                # An empty static result may just mean the player is injected
+                # by JS, so prefer whatever the browser found.
+                if not audio_urls:
+                    audio_urls = browser_audio
+                if reactions is None:
+                    reactions = browser_reactions
+            else:
+                self.logger.info(f"Static extraction miss and browser disabled: {url}")
+
+        if audio_urls is None:
+            audio_urls = []
+        if reactions is None:
+            reactions = {"star": 0, "like": 0, "love": 0}
+        return audio_urls, reactions
+
+    def extract_static_audio(self, soup):
+        """
+        Audio URLs from the static HTML.
 
-                page += 1
-                time.sleep(1)
-            except Exception:
-                self.logger.error("Comment API failed", exc_info=True)
-                break
-        return all_comments
+        Returns [] when the article has no audio player at all, and None when
+        a player placeholder exists but its source is only set by JS.
+        """
+        scope = soup.select_one("#main-detail") or soup
+        urls = []
+
+        for el in scope.select("audio[src], audio source[src]"):
+            urls.append(el["src"])
+        for el in scope.select(AUDIO_DATA_SELECTOR):
+            for attr in AUDIO_DATA_ATTRS:
+                value = el.get(attr)
+                if value and AUDIO_URL_RE.fullmatch(value):
+                    urls.append(value)
+        for script in soup.select("script:not([src])"):
+            urls.extend(AUDIO_URL_RE.findall(script.get_text()))
+
+        if urls:
+            return [{"url": u} for u in dict.fromkeys(urls)]
+        if scope.select_one(AUDIO_PLACEHOLDER_SELECTOR):
+            return None
+        return []
+
+    def extract_static_reactions(self, soup, post_id):
+        """
+        Reaction counts from server-rendered reactinfo markup, else from the
+        configured reaction JSON endpoint. None means neither had them.
+        """
+        if soup.select_one(REACTINFO_SELECTOR):
+            reactions = {}
+            for key, sel in REACTION_SELECTORS.items():
+                el = soup.select_one(f"{REACTINFO_SELECTOR} > {sel}")
+                text = el.get_text(strip=True).replace(',', '') if el else ""
+                if not text.isdigit():
+                    break
+                reactions[key] = int(text)
+            else:
+                return reactions
 
+        if not self.reaction_api_url:
+            return None
+        try:
+            r = self.session.get(
+                self.reaction_api_url.format(post_id=post_id),
+                headers=self.comment_headers,
+                timeout=10
+            )
+            r.raise_for_status()
+            return self._parse_reaction_payload(r.json())
+        except Exception:
+            self.logger.error(f"Reaction API failed for {post_id}", exc_info=True)
+            return None
+
+    def _parse_reaction_payload(self, data):
+        """Find star/like/love counts in a JSON payload (Data may itself be a JSON string)."""
+        if isinstance(data, dict) and isinstance(data.get("Data"), str):
+            data = json.loads(data["Data"] or "null")
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                lowered = {str(k).lower(): v for k, v in node.items()}
+                if all(key in lowered for key in REACTION_SELECTORS):
+                    return {key: int(lowered[key] or 0) for key in REACTION_SELECTORS}
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        return None
+
+    def extract_browser_data(self, url, page=None, ready_timeout=READY_TIMEOUT):
+        """
+        Single navigation that returns (audio_urls, reactions).
 
-    def extract_audio_urls(self, url, wait_time=5):
-        audios = []
+        Instead of sleeping a fixed time, waits until both the audio player
+        and the reactinfo counters are in the DOM or the network has gone
+        quiet, whichever comes first, capped at `ready_timeout` seconds.
+        Navigation errors and timeouts are raised, not turned into zeros.
+        """
+        if page is None:
+            return self.browser_pool.run(self._extract_on_page, url, ready_timeout)
+        return self._extract_on_page(page, url, ready_timeout)
+
+    def _extract_on_page(self, page, url, ready_timeout=READY_TIMEOUT):
+        """extract_browser_data on a given page; the pool runs this on its slot thread."""
+        limiter = get_limiter()
+        if limiter:
+            limiter.acquire(url)
+
+        timings = {}
+        start = time.perf_counter()
+        ready = "error"
+        counter = RequestCounter(page)
         try:
-            self.page.goto(url, timeout=60000)
-            time.sleep(wait_time)  # wait for JS to load
-            audio_elements = self.page.query_selector_all("audio")
-            for a in audio_elements:
-                src = a.get_attribute("src")
-                if src:
-                    audios.append(
-                        {
-                            "url": src
-                        }
-                    )
+            with counter:
+                try:
+                    response = page.goto(url, timeout=60000, wait_until="domcontentloaded")
+                except Exception:
+                    if limiter:
+                        limiter.feedback(url)
+                    raise
+                timings["goto"] = time.perf_counter() - start
+                if limiter:
+                    limiter.feedback(url, response.status if response else None, timings["goto"])
+
+                t = time.perf_counter()
+                ready = self._wait_until_ready(page, ready_timeout)
+                timings["ready"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            audio_urls = self._read_audio_urls(page)
+            timings["audio"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            reactions = self._read_reactions(page)
+            timings["reactions"] = time.perf_counter() - t
         except Exception:
-            self.logger.error(f"Failed extracting audio from {url}", exc_info=True)
+            # Raised to crawl_article, which classifies it (e.g. browser_timeout) and retries.
+            self.logger.error(f"Failed browser extraction from {url}", exc_info=True)
+            raise
+        finally:
+            timings["total"] = time.perf_counter() - start
+            self.logger.info(
+                f"Browser timings ({ready}) {url} | "
+                + " ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items())
+                + f" | requests {counter.summary()}"
+            )
+        return audio_urls, reactions
 
-        
+    def _wait_until_ready(self, page, timeout):
+        """Returns which condition fired: 'dom', 'idle' or 'timeout'."""
+        try:
+            handle = page.wait_for_function(
+                READY_SCRIPT,
+                arg=[AUDIO_SELECTOR, REACTINFO_SELECTOR, NETWORK_IDLE_MS],
+                polling=100,
+                timeout=timeout * 1000
+            )
+            return handle.json_value()
+        except PlaywrightTimeoutError:
+            return "timeout"
+
+    def _read_audio_urls(self, page):
+        audios = []
+        for a in page.query_selector_all(AUDIO_SELECTOR):
+            src = a.get_attribute("src")
+            if src:
+                audios.append(
+                    {
+                        "url": src
+                    }
+                )
         return audios
 
-    def extract_reactions(self, url, wait_time=10):
+    def _read_reactions(self, page):
         reactions = {"star": 0, "like": 0, "love": 0}
+        for key, sel in REACTION_SELECTORS.items():
+            el = page.query_selector(f"{REACTINFO_SELECTOR} > {sel}")
+            if el:
+                text = el.inner_text().strip().replace(',', '')
+                reactions[key] = int(text) if text.isdigit() else 0
+        return reactions
+
+    def extract_audio_urls(self, url, wait_time=READY_TIMEOUT, page=None):
+        return self.extract_browser_data(url, page=page, ready_timeout=wait_time)[0]
+
+    def extract_reactions(self, url, wait_time=READY_TIMEOUT, page=None):
+        return self.extract_browser_data(url, page=page, ready_timeout=wait_time)[1]
+
+    def download_images(self, post_id, images):
+        """Download every image in parallel; sets local_path/sha256 on the ones that succeed."""
+        engine = get_engine()
+        if engine:
+            return engine.run(self.async_download_images(post_id, images))
+        return self.media.download_many(images)
+
+    def download_audio(self, post_id, audios):
+        engine = get_engine()
+        if engine:
+            return engine.run(self.async_download_audio(post_id, audios))
+        return self.media.download_many(audios)
+
+    # ---------------------------
+    # Async variants (httpx)
+    # ---------------------------
+    # With the shared engine enabled (async_request_sender.configure_engine)
+    # the sync methods above run these on the engine loop; otherwise call
+    # start_async_client() on your own loop first.
+    async def start_async_client(self, max_connections=100):
+        """Open the httpx client used by the async_* methods on the current event loop."""
+        self.async_client = make_async_client(max_connections=max_connections)
+
+    async def stop_async_client(self):
+        if self.async_client:
+            await self.async_client.aclose()
+        self.async_client = None
+
+    def _client(self):
+        """httpx client of start_async_client, else the shared engine's."""
+        if self.async_client:
+            return self.async_client
+        engine = get_engine()
+        if engine is None:
+            raise RuntimeError("No async client: call start_async_client() or enable the async engine")
+        return engine.client
+
+    async def async_send_request(self, url):
+        self.logger.debug(f"Fetching URL: {url}")
         try:
-            # self.page.goto(url, timeout=60000)
-            # wait for reactions container
-            self.page.wait_for_selector(
-                "#main-detail > div.sendstarauthor > div > div > div.reactinfo",
-                timeout=wait_time*1000
-            )
-            selectors = {
-                "star": "span:nth-child(2) > span",
-                "like": "span:nth-child(3) > span",
-                "love": "span:nth-child(4) > span"
-            }
-            for key, sel in selectors.items():
-                el = self.page.query_selector(f"#main-detail > div.sendstarauthor > div > div > div.reactinfo > {sel}")
-                if el:
-                    text = el.inner_text().strip().replace(',', '')
-                    reactions[key] = int(text) if text.isdigit() else 0
+            text = await fetch_text(self._client(), url, headers=PAGE_HEADERS, timeout=15)
+
         except Exception:
-            self.logger.error(f"Failed extracting reactions from {url}", exc_info=True)
+            self.logger.error(f"Request failed: {url}", exc_info=True)
+            raise
 
-        return reactions
+        return make_soup(text)
 
-    def download_images(self, post_id, images):
-        if not images:
-            return images
-        
-        folder = self.image_dir / post_id
-        os.makedirs(folder, exist_ok=True)
-        for image in images:
-            url = image["url"]
-            try:
-                r = session.get(url, timeout=10)
-                filename = os.path.basename(urlparse(url).path)
-                path = os.path.join(folder, filename)
-                with open(path, "wb") as f:
-                    f.write(r.content)
-                image["local_path"] = path
-            except Exception:
-                self.logger.error(f"Image download failed: {url}", exc_info=True)
+    async def async_extract_comments_api(self, post_id):
+        """
+        Async counterpart of extract_comments_api: page 1 first, then the
+        remaining pages concurrently, `comment_workers` at a time, up to the
+        total page 1 reports (or the first empty page).
+        """
+        tree = CommentTree()
+        first = await self._async_fetch_comment_page(post_id, 1)
+        if not first:
+            return self._comments_json(post_id, tree)
+        items, data = first
+        CommentTree.from_api_items(items, tree)
+
+        max_pages = self.max_comment_pages or float("inf")
+        total = self._comment_total(data)
+        if total is not None:
+            last_page = min(max_pages, math.ceil(total / len(items)))
+        else:
+            last_page = max_pages
+
+        page = 2
+        while page <= last_page:
+            window = range(page, int(min(last_page, page + self.comment_workers - 1)) + 1)
+            results = await asyncio.gather(*(self._async_fetch_comment_page(post_id, p) for p in window))
+            for result in results:
+                if not result:
+                    return self._comments_json(post_id, tree)
+                CommentTree.from_api_items(result[0], tree)
+            page = window.stop
+        return self._comments_json(post_id, tree)
+
+    async def _async_fetch_comment_page(self, post_id, page):
+        """Async _fetch_comment_page: (API items, raw payload), None when empty; errors are raised."""
+        try:
+            r = await self._client().get(
+                self.comment_api_url,
+                params=self._comment_params(post_id, page),
+                headers=self.comment_headers
+            )
+            r.raise_for_status()
+            data = r.json()
+        except Exception:
+            self.logger.error(f"Comment API failed: {post_id} page {page}", exc_info=True)
+            raise
+        items = self._parse_comment_page(data)
+        if not items:
+            return None
+        return items, data
 
+    async def async_download_images(self, post_id, images):
+        await asyncio.gather(*(self._async_download_media(image) for image in images))
         return images
 
-    def download_audio(self, post_id, audios):
-        if not audios:
-            return audios
-        folder = self.audio_dir / post_id
-        os.makedirs(folder, exist_ok=True)
-        for audio in audios:
-            url = audio["url"]
-            i = audios.index(audio) + 1
-            try:
-                r = session.get(url, timeout=15)
-                ext = url.split(".")[-1]
-                path = os.path.join(folder, f"{post_id}_{i}.{ext}")
-                with open(path, "wb") as f:
-                    f.write(r.content)
-                audio["local_path"] = path
-            except Exception:
-                self.logger.error(f"Audio download failed: {url}", exc_info=True)
-
+    async def async_download_audio(self, post_id, audios):
+        await asyncio.gather(*(self._async_download_media(audio) for audio in audios))
         return audios
-    
+
+    async def _async_download_media(self, item):
+        """Stream one media file to disk and hand it to the content-addressed store."""
+        url = item["url"]
+        try:
+            entry = self.media.lookup(url)
+            if entry is None:
+                os.makedirs(self.media_dir, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.media_dir, suffix=".part")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        async with self._client().stream("GET", url, timeout=20) as r:
+                            r.raise_for_status()
+                            async for chunk in r.aiter_bytes():
+                                f.write(chunk)
+                    entry = self.media.store_file(tmp_path, url, r.headers)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            item["sha256"], item["local_path"] = entry[0], entry[1]
+        except Exception:
+            self.logger.error(f"Media download failed: {url}", exc_info=True)
+
     def save_post_json(self, post_data):
         os.makedirs(self.data_dir, exist_ok=True)
         path = os.path.join(self.data_dir, f"{post_data['postId']}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(post_data, f, ensure_ascii=False, indent=2)
+        # Write then rename so a crash never leaves a half-written file that
+        # a resume or the JSON importer would treat as finished. The temp name
+        # is unique, so two writers of the same article never share it.
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(post_data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def log_failed_url(self, url, reason=""):
+        os.makedirs(self.log_dir, exist_ok=True)
         path = self.log_dir / "failed_urls.txt"
-        with open(path, "a", encoding="utf-8") as f:
+        with self._failed_lock, open(path, "a", encoding="utf-8") as f:
             f.write(f"{url} | {reason}\n")
 
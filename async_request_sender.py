@@ -0,0 +1,188 @@
+import asyncio
+import random
+import threading
+import time
+from html_parser import make_soup
+import httpx
+# Module import: request_sender also imports this module (for get_engine).
+import request_sender
+from http_client import DEFAULT_BACKOFF, DEFAULT_RETRIES, INSECURE_HOSTS, RETRY_STATUSES, http2_available
+from http_cache import get_cache
+from rate_limiter import get_limiter, retry_after_seconds
+
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+class RateLimitedAsyncTransport(httpx.AsyncHTTPTransport):
+    """
+    Async counterpart of http_client.RateLimitedAdapter: every request goes
+    through the per-host budget, and GET/HEAD answered with a RETRY_STATUSES
+    code is retried `status_retries` times with jittered exponential backoff
+    (httpx's own `retries` only covers connection failures).
+    """
+
+    def __init__(self, *args, status_retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.status_retries = status_retries
+        self.backoff = backoff
+
+    async def handle_async_request(self, request):
+        attempt = 0
+        while True:
+            response = await self._send(request)
+            if (
+                request.method not in ("GET", "HEAD")
+                or response.status_code not in RETRY_STATUSES
+                or attempt >= self.status_retries
+            ):
+                return response
+            attempt += 1
+            await response.aclose()
+            delay = self.backoff * 2 ** (attempt - 1) + random.uniform(0, self.backoff)
+            await asyncio.sleep(max(delay, retry_after_seconds(response.headers.get("Retry-After")) or 0))
+
+    async def _send(self, request):
+        limiter = get_limiter()
+        if not limiter:
+            return await super().handle_async_request(request)
+
+        url = str(request.url)
+        await limiter.acquire_async(url)
+        start = time.monotonic()
+        try:
+            response = await super().handle_async_request(request)
+        except httpx.TransportError:
+            limiter.feedback(url)
+            raise
+        limiter.feedback(url, response.status_code, time.monotonic() - start, response.headers.get("Retry-After"))
+        return response
+
+
+def make_async_client(headers=None, max_connections=DEFAULT_MAX_CONNECTIONS, timeout=15, retries=DEFAULT_RETRIES):
+    """
+    Build an httpx.AsyncClient shared by every coroutine on one event loop.
+
+    Uses HTTP/2 (one multiplexed connection per host) when `h2` is
+    installed; `retries` covers connection failures and 429/5xx answers,
+    like the sync session's transport retries. Requests go through the
+    rate_limiter budget like the sync session's.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections
+    )
+    transport = RateLimitedAsyncTransport(
+        http2=http2_available(),
+        limits=limits,
+        retries=retries,
+        status_retries=retries
+    )
+    # Like the sync session, only tuoitre's own hosts skip TLS verification.
+    insecure = RateLimitedAsyncTransport(
+        verify=False,
+        http2=http2_available(),
+        limits=limits,
+        retries=retries,
+        status_retries=retries
+    )
+    return httpx.AsyncClient(
+        headers=headers,
+        transport=transport,
+        mounts={prefix.rstrip("/"): insecure for prefix in INSECURE_HOSTS},
+        timeout=timeout,
+        follow_redirects=True
+    )
+
+
+async def fetch_text(client, url, headers=None, timeout=15):
+    """Body of `url` as text over an httpx client, through the HTTP cache when enabled."""
+    cache = get_cache()
+    if cache:
+        return await cache.fetch_text_async(client, url, headers=headers, timeout=timeout)
+
+    r = await client.get(url, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    return r.text
+
+
+class AsyncRequestSender:
+    """Async counterpart of RequestSender: same headers, same return type."""
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, concurrency=20):
+        self.headers = dict(request_sender.RequestSender().headers)
+        self.client = make_async_client(self.headers, max_connections=max_connections, timeout=10)
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def send_request(self, url):
+        return make_soup(await self.fetch_text(url))
+
+    async def fetch_text(self, url):
+        async with self.semaphore:
+            return await fetch_text(self.client, url, headers=self.headers, timeout=10)
+
+    async def send_many(self, urls):
+        """Fetch every URL concurrently; failed URLs map to the raised exception."""
+        results = await asyncio.gather(
+            *(self.send_request(url) for url in urls),
+            return_exceptions=True
+        )
+        return dict(zip(urls, results))
+
+
+# ---------------------------
+# Shared engine for the sync API
+# ---------------------------
+class AsyncEngine:
+    """
+    One event loop on a background thread with one httpx client, shared by
+    every thread in the process. The sync API (RequestSender, ArticleCrawler)
+    hands it coroutines through run(), so all in-flight requests wait on this
+    loop and share its connections instead of each blocking a pooled socket.
+    """
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, retries=DEFAULT_RETRIES):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="AsyncEngine", daemon=True)
+        self._thread.start()
+        self.client = self.run(self._open(max_connections, retries))
+
+    async def _open(self, max_connections, retries):
+        return make_async_client(max_connections=max_connections, retries=retries)
+
+    def run(self, coro):
+        """Run `coro` on the engine loop; blocks the calling thread (never the loop itself) until it is done."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self):
+        self.run(self.client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def configure_engine(enabled=True, max_connections=DEFAULT_MAX_CONNECTIONS, retries=DEFAULT_RETRIES):
+    """Route the sync API through a shared AsyncEngine, or back to the requests session when disabled."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+        _engine = AsyncEngine(max_connections, retries) if enabled else None
+    return _engine
+
+
+def get_engine():
+    """The shared AsyncEngine, or None when the sync session is used (the default)."""
+    return _engine
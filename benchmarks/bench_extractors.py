@@ -0,0 +1,240 @@
+"""
+Offline extraction benchmark over the saved fixtures.
+
+Reports latency (mean/p50/p95), throughput and peak traced memory for every
+extractor and for the full extract_post_data path, using only files in
+benchmarks/fixtures (comment API pages are replayed, the browser is off).
+Results can be saved and compared across commits:
+
+    python benchmarks/bench_extractors.py --output before.json
+    git checkout other-branch
+    python benchmarks/bench_extractors.py --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from html_parser import BACKENDS, get_backend, make_soup, set_backend
+from article_crawler import ArticleCrawler
+from comment_tree import CommentTree
+from crawl_categories import (
+    DEFAULT_BASE_URL,
+    extract_from_main,
+    extract_from_sub,
+    extract_rss_urls,
+    extract_timeline_id,
+    get_focus_list_urls,
+)
+
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+class ReplayCrawler(ArticleCrawler):
+    """ArticleCrawler that serves the comment API from a saved payload and never opens a browser."""
+
+    def __init__(self, comment_payload):
+        super().__init__(use_browser=False)
+        self.comment_payload = comment_payload
+
+    def _fetch_comment_page(self, post_id, page):
+        if page > 1 or not self.comment_payload:
+            return None
+        items = self._parse_comment_page(self.comment_payload)
+        return (items, self.comment_payload) if items else None
+
+
+# ---------------------------
+# ✅ MEASUREMENT
+# ---------------------------
+def measure(fn, repeat):
+    fn()  # warm-up
+    durations = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations.sort()
+    mean = sum(durations) / len(durations)
+    return {
+        "mean_ms": mean * 1000,
+        "p50_ms": durations[len(durations) // 2] * 1000,
+        "p95_ms": durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000,
+        "per_sec": 1 / mean if mean else float("inf"),
+        "peak_kb": peak / 1024,
+    }
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def fixtures(prefix, suffix):
+    return sorted(n for n in os.listdir(FIXTURE_DIR) if n.startswith(prefix) and n.endswith(suffix))
+
+
+# ---------------------------
+# ✅ CASES
+# ---------------------------
+def build_cases():
+    """Yield (name, zero-arg callable) for every benchmarked function and fixture."""
+    comment_files = fixtures("comments", ".json")
+    comment_payload = json.loads(read_fixture(comment_files[0])) if comment_files else None
+    crawler = ReplayCrawler(comment_payload)
+
+    for name in fixtures("article", ".html"):
+        html = read_fixture(name)
+        soup = make_soup(html)
+        url = f"{DEFAULT_BASE_URL}/bai-viet-benchmark-{name.replace('.html', '')}.htm"
+        post_id = crawler.extract_post_id(url)
+
+        yield f"{name}:parse", lambda html=html: make_soup(html)
+        yield f"{name}:extract_title", lambda soup=soup: crawler.extract_title(soup)
+        yield f"{name}:extract_date", lambda soup=soup: crawler.extract_date(soup)
+        yield f"{name}:extract_author", lambda soup=soup: crawler.extract_author(soup)
+        yield f"{name}:extract_content", lambda soup=soup: crawler.extract_content(soup)
+        yield f"{name}:extract_images", lambda soup=soup: crawler.extract_images(soup)
+        yield f"{name}:extract_static_audio", lambda soup=soup: crawler.extract_static_audio(soup)
+        yield f"{name}:extract_static_reactions", lambda soup=soup: crawler.extract_static_reactions(soup, post_id)
+        yield (
+            f"{name}:extract_post_data",
+            lambda html=html, url=url: crawler.extract_post_data(make_soup(html), url, category="Benchmark")
+        )
+
+    for name in fixtures("category", ".html"):
+        soup = make_soup(read_fixture(name))
+        yield f"{name}:parse", lambda name=name: make_soup(read_fixture(name))
+        yield f"{name}:get_focus_list_urls", lambda soup=soup: get_focus_list_urls(soup, DEFAULT_BASE_URL)
+        yield f"{name}:extract_from_sub", lambda soup=soup: extract_from_sub(soup, DEFAULT_BASE_URL)
+        yield f"{name}:extract_from_main", lambda soup=soup: extract_from_main(soup, DEFAULT_BASE_URL)
+        yield f"{name}:extract_timeline_id", lambda soup=soup: extract_timeline_id(soup)
+
+    for name in fixtures("timeline", ".html"):
+        html = read_fixture(name)
+        yield f"{name}:parse+extract_from_main", lambda html=html: extract_from_main(make_soup(html), DEFAULT_BASE_URL)
+
+    for name in comment_files:
+        payload = json.loads(read_fixture(name))
+        yield (
+            f"{name}:comment_tree",
+            lambda payload=payload: CommentTree.from_api_items(crawler._parse_comment_page(payload)).to_json()
+        )
+
+    for name in fixtures("rss", ".xml"):
+        xml = read_fixture(name)
+        yield f"{name}:extract_rss_urls", lambda xml=xml: extract_rss_urls(xml, DEFAULT_BASE_URL)
+
+
+# ---------------------------
+# ✅ REPORTING
+# ---------------------------
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_table(results, baseline=None):
+    header = f"{'case':<52} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'ops/s':>9} {'peak KB':>9}"
+    if baseline:
+        header += f" {'Δmean':>8}"
+    print(header)
+    for case, r in results.items():
+        line = (
+            f"{case:<52} {r['mean_ms']:9.3f} {r['p50_ms']:9.3f} {r['p95_ms']:9.3f} "
+            f"{r['per_sec']:9.1f} {r['peak_kb']:9.1f}"
+        )
+        if baseline:
+            old = baseline.get(case)
+            line += f" {(r['mean_ms'] / old['mean_ms'] - 1) * 100:+7.1f}%" if old else f" {'new':>8}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of every extractor on saved fixtures")
+
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=30,
+        help="Timed iterations per case"
+    )
+
+    parser.add_argument(
+        "--parser",
+        type=str,
+        default=get_backend(),
+        choices=BACKENDS,
+        help="HTML parser backend"
+    )
+
+    parser.add_argument(
+        "--filter",
+        type=str,
+        default=None,
+        help="Only run cases whose name contains this substring"
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write results as JSON to this path"
+    )
+
+    parser.add_argument(
+        "--compare",
+        type=str,
+        default=None,
+        help="Previous --output file to compare mean latency against"
+    )
+
+    args = parser.parse_args()
+    set_backend(args.parser)
+
+    results = {}
+    for case, fn in build_cases():
+        if args.filter and args.filter not in case:
+            continue
+        results[case] = measure(fn, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print_table(results, baseline)
+
+    if args.output:
+        report = {
+            "revision": git_revision(),
+            "parser": args.parser,
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
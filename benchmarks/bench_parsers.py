@@ -0,0 +1,110 @@
+"""
+Parse + extract time per page for every HTML parser backend.
+
+Runs the article extractors over saved article fixtures and the listing
+extractors over saved category fixtures, fully offline:
+
+    python benchmarks/bench_parsers.py --repeat 50
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from html_parser import BACKENDS, make_soup
+from article_crawler import ArticleCrawler
+from crawl_categories import (
+    DEFAULT_BASE_URL,
+    extract_from_main,
+    extract_from_sub,
+    extract_timeline_id,
+    get_focus_list_urls,
+)
+
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def extract_article(crawler, soup):
+    return {
+        "title": crawler.extract_title(soup),
+        "date": crawler.extract_date(soup),
+        "author": crawler.extract_author(soup),
+        "content": crawler.extract_content(soup),
+        "images": crawler.extract_images(soup),
+    }
+
+
+def extract_listing(soup):
+    return {
+        "focus": sorted(get_focus_list_urls(soup, DEFAULT_BASE_URL)),
+        "sub": sorted(extract_from_sub(soup, DEFAULT_BASE_URL)),
+        "main": sorted(extract_from_main(soup, DEFAULT_BASE_URL)),
+        "timeline_id": extract_timeline_id(soup),
+    }
+
+
+def available_backends():
+    usable = []
+    for backend in BACKENDS:
+        try:
+            make_soup("<p></p>", backend=backend)
+        except Exception as e:
+            print(f"[WARNING] Skipping backend {backend}: {e}")
+            continue
+        usable.append(backend)
+    return usable
+
+
+def bench(fixture, extract, backends, repeat):
+    with open(os.path.join(FIXTURE_DIR, fixture), "r", encoding="utf-8") as f:
+        html = f.read()
+
+    reference = None
+    for backend in backends:
+        parse_time = extract_time = 0.0
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            soup = make_soup(html, backend=backend)
+            t1 = time.perf_counter()
+            result = extract(soup)
+            t2 = time.perf_counter()
+            parse_time += t1 - t0
+            extract_time += t2 - t1
+
+        same = "reference" if reference is None else ("same" if result == reference else "DIFFERENT")
+        reference = result if reference is None else reference
+        print(
+            f"{fixture:<22} {backend:<12} parse={parse_time / repeat * 1000:8.2f}ms "
+            f"extract={extract_time / repeat * 1000:8.2f}ms "
+            f"total={(parse_time + extract_time) / repeat * 1000:8.2f}ms  output={same}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends on saved fixtures")
+
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=20,
+        help="Iterations per fixture and backend"
+    )
+
+    args = parser.parse_args()
+
+    crawler = ArticleCrawler()
+    backends = available_backends()
+    fixtures = sorted(os.listdir(FIXTURE_DIR))
+
+    for fixture in fixtures:
+        if fixture.startswith("article") and fixture.endswith(".html"):
+            bench(fixture, lambda soup: extract_article(crawler, soup), backends, args.repeat)
+        elif fixture.startswith("category") and fixture.endswith(".html"):
+            bench(fixture, extract_listing, backends, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Golden-file check for article body extraction.
+
+For every saved article fixture, extract_content output must match
+benchmarks/golden/<fixture>.txt byte for byte on every parser backend:
+
+    python benchmarks/check_golden.py            # verify
+    python benchmarks/check_golden.py --update   # rewrite goldens
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from html_parser import BACKENDS, make_soup
+from article_crawler import ArticleCrawler
+
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+GOLDEN_DIR = os.path.join(ROOT, "benchmarks", "golden")
+
+
+def article_fixtures():
+    return sorted(
+        name for name in os.listdir(FIXTURE_DIR)
+        if name.startswith("article") and name.endswith(".html")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare extract_content output with golden files")
+
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Write current html.parser output as the new golden files"
+    )
+
+    args = parser.parse_args()
+
+    crawler = ArticleCrawler()
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    failures = 0
+
+    for fixture in article_fixtures():
+        with open(os.path.join(FIXTURE_DIR, fixture), "r", encoding="utf-8") as f:
+            html = f.read()
+        golden_path = os.path.join(GOLDEN_DIR, fixture.replace(".html", ".txt"))
+
+        if args.update:
+            content = crawler.extract_content(make_soup(html, backend="html.parser"))
+            with open(golden_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            print(f"[INFO] Wrote {golden_path}")
+            continue
+
+        if not os.path.exists(golden_path):
+            print(f"[MISSING] {fixture}: no golden file, run with --update")
+            failures += 1
+            continue
+        with open(golden_path, "r", encoding="utf-8") as f:
+            expected = f.read()
+
+        for backend in BACKENDS:
+            try:
+                soup = make_soup(html, backend=backend)
+            except Exception as e:
+                print(f"[WARNING] Skipping backend {backend}: {e}")
+                continue
+            ok = crawler.extract_content(soup) == expected
+            failures += not ok
+            print(f"{'[OK]  ' if ok else '[FAIL]'} {fixture} ({backend})")
+
+    if failures:
+        print(f"[ERROR] {failures} golden mismatches")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Record live tuoitre.vn responses into benchmarks/fixtures for offline runs.
+
+    python benchmarks/record_fixtures.py --category_url https://tuoitre.vn/thoi-su.htm --articles 3
+
+Saves the category page, its first timeline page, the category RSS feed,
+and for the first N articles the article HTML and the first comment API
+page. File names follow the prefixes the benchmarks look for
+(article_*, category_*, timeline_*, comments_*, rss_*).
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+from html_parser import make_soup
+from http_client import get_session
+from request_sender import RequestSender
+from article_crawler import ArticleCrawler, COMMENT_API_URL, COMMENT_HEADERS
+from crawl_categories import DEFAULT_BASE_URL, extract_from_main, extract_timeline_id
+
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def save(name, content):
+    path = os.path.join(FIXTURE_DIR, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"[INFO] Saved {path} ({len(content)} chars)")
+
+
+def fetch(url, **kwargs):
+    r = get_session().get(url, headers=RequestSender().headers, timeout=15, **kwargs)
+    r.raise_for_status()
+    return r.text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record live responses as benchmark fixtures")
+
+    parser.add_argument(
+        "--category_url",
+        type=str,
+        default=f"{DEFAULT_BASE_URL}/thoi-su.htm",
+        help="Category page to record"
+    )
+
+    parser.add_argument(
+        "--base_url",
+        type=str,
+        default=DEFAULT_BASE_URL,
+        help="Base website URL"
+    )
+
+    parser.add_argument(
+        "--articles",
+        type=int,
+        default=3,
+        help="Number of articles (and their comment pages) to record"
+    )
+
+    args = parser.parse_args()
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+
+    slug = args.category_url.rstrip("/").split("/")[-1].replace(".htm", "")
+    category_html = fetch(args.category_url)
+    save(f"category_{slug}.html", category_html)
+    soup = make_soup(category_html)
+
+    timeline_id = extract_timeline_id(soup)
+    if timeline_id:
+        save(f"timeline_{timeline_id}_2.html", fetch(f"{args.base_url}/timeline/{timeline_id}/trang-2.htm"))
+
+    try:
+        save(f"rss_{slug}.xml", fetch(f"{args.base_url}/rss/{slug}.rss"))
+    except requests.RequestException as e:
+        print(f"[WARNING] RSS not recorded: {e}")
+
+    crawler = ArticleCrawler()
+    for url in extract_from_main(soup, args.base_url)[:args.articles]:
+        post_id = crawler.extract_post_id(url)
+        save(f"article_{post_id}.html", fetch(url))
+        r = get_session().get(
+            COMMENT_API_URL,
+            params=crawler._comment_params(post_id, 1),
+            headers=COMMENT_HEADERS,
+            timeout=15
+        )
+        save(f"comments_{post_id}.json", r.text)
+
+    print("[INFO] Run `python benchmarks/check_golden.py --update` to add goldens for new articles")
+
+
+if __name__ == "__main__":
+    main()
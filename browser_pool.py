@@ -0,0 +1,190 @@
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from playwright.sync_api import sync_playwright
+from logger_config import get_logger
+
+
+class BrowserSlot:
+    """
+    One Playwright browser + page, owned by a dedicated thread.
+
+    The sync Playwright API can only be driven from the thread that started
+    it, so callers never touch the page directly: they hand a function to
+    `run`, which executes `fn(page, *args)` on the slot's thread and returns
+    its result (or re-raises its exception).
+    """
+
+    def __init__(self, index, headless=True, recycle_after=200, resource_policy=None, logger=None):
+        self.index = index
+        self.headless = headless
+        self.recycle_after = recycle_after
+        self.resource_policy = resource_policy
+        self.logger = logger or get_logger("BrowserPool")
+
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.navigations = 0
+        self.recycles = 0
+        self.crashed = False
+
+        self._tasks = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._loop,
+            name=f"BrowserSlot-{index}",
+            daemon=True
+        )
+        self._thread.start()
+
+    # ---------------------------
+    # Public API (any thread)
+    # ---------------------------
+    def run(self, fn, *args):
+        future = Future()
+        self._tasks.put((fn, args, future))
+        return future.result()
+
+    def close(self):
+        self._tasks.put(None)
+        self._thread.join()
+
+    # ---------------------------
+    # Slot thread only
+    # ---------------------------
+    def _loop(self):
+        self._safe_start()
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            fn, args, future = task
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                if not self._is_healthy():
+                    self._recycle("health check failed")
+                if self.page is None:
+                    raise RuntimeError(f"Browser slot {self.index} has no page (browser failed to start)")
+                result = fn(self.page, *args)
+            except Exception as e:
+                future.set_exception(e)
+                if not self._is_healthy():
+                    self._recycle(f"page died: {e}")
+            else:
+                future.set_result(result)
+
+            self.navigations += 1
+            if self.recycle_after and self.navigations >= self.recycle_after:
+                self._recycle(f"reached {self.navigations} navigations")
+
+        self._stop()
+
+    def _start(self):
+        self.playwright = sync_playwright().start()
+        self.browser = self.playwright.chromium.launch(headless=self.headless)
+        self.context = self.browser.new_context()
+        if self.resource_policy:
+            self.resource_policy.install(self.context)
+        self.page = self.context.new_page()
+        self.page.on("crash", self._on_crash)
+        self.navigations = 0
+        self.crashed = False
+        self.logger.info(f"Browser slot {self.index} started")
+
+    def _stop(self):
+        for closer in (
+            lambda: self.page and self.page.close(),
+            lambda: self.context and self.context.close(),
+            lambda: self.browser and self.browser.close(),
+            lambda: self.playwright and self.playwright.stop(),
+        ):
+            try:
+                closer()
+            except Exception:
+                # The browser may already be gone; nothing left to release.
+                pass
+        self.playwright = self.browser = self.context = self.page = None
+
+    def _safe_start(self):
+        try:
+            self._start()
+        except Exception:
+            # Leave the slot empty; the next task's health check retries.
+            self.logger.error(f"Browser slot {self.index} failed to start", exc_info=True)
+            self._stop()
+
+    def _recycle(self, reason):
+        self.logger.warning(f"Recycling browser slot {self.index}: {reason}")
+        self.recycles += 1
+        self._stop()
+        self._safe_start()
+
+    def _on_crash(self, _page):
+        self.crashed = True
+
+    def _is_healthy(self):
+        if self.page is None:
+            return False
+        if self.crashed or self.page.is_closed() or not self.browser.is_connected():
+            return False
+        try:
+            self.page.evaluate("1")
+        except Exception:
+            return False
+        return True
+
+
+class BrowserPool:
+    """
+    Fixed-size pool of BrowserSlots with checkout/return semantics.
+
+    Slots are health-checked before every task and restarted after
+    `recycle_after` navigations or as soon as their page/browser dies.
+    When a ResourcePolicy is given it is installed on every slot's context.
+    """
+
+    def __init__(self, size=1, headless=True, recycle_after=200, resource_policy=None):
+        self.logger = get_logger("BrowserPool")
+        self.slots = [
+            BrowserSlot(
+                i,
+                headless=headless,
+                recycle_after=recycle_after,
+                resource_policy=resource_policy,
+                logger=self.logger
+            )
+            for i in range(size)
+        ]
+        self._available = queue.Queue()
+        for slot in self.slots:
+            self._available.put(slot)
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Borrow a slot, blocking until one is free; it is returned on exit."""
+        slot = self._available.get(timeout=timeout)
+        try:
+            yield slot
+        finally:
+            self._available.put(slot)
+
+    def run(self, fn, *args):
+        """Run fn(page, *args) on the next free slot."""
+        with self.checkout() as slot:
+            return slot.run(fn, *args)
+
+    def stats(self):
+        return {
+            "size": len(self.slots),
+            "available": self._available.qsize(),
+            "navigations": sum(slot.navigations for slot in self.slots),
+            "recycles": sum(slot.recycles for slot in self.slots),
+        }
+
+    def close(self):
+        for slot in self.slots:
+            slot.close()
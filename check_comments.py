@@ -1,52 +1,239 @@
+import argparse
 import os
+import sys
 import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from comment_tree import count_comments
 
 DATA_DIR = "crawled_data"   # <-- change this to your folder path
 COMMENT_THRESHOLD = 20
-
-def count_comments_recursive(comments, current_depth=1):
-    total = 0
-    max_depth = current_depth
-
-    for comment in comments:
-        total += 1  # count this comment
-
-        replies = comment.get("replies", [])
-        if isinstance(replies, list) and replies:
-            cnt, child_depth = count_comments_recursive(replies, current_depth + 1)
-            total += cnt
-
-            # ✅ track the deepest level
-            max_depth = max(max_depth, child_depth)
-
-    return total, max_depth
-
-
-def main():
-    for filename in os.listdir(DATA_DIR):
-        if not filename.endswith(".json"):
+INDEX_FILENAME = "comment_stats.jsonl"
+# Written next to the articles by the category crawl; not an article.
+CATEGORIES_FILENAME = "categories.json"
+CHUNK_SIZE = 64
+
+
+# ---------------------------
+# ✅ PER-ARTICLE STATS
+# ---------------------------
+def article_stats(filepath):
+    """Parse one article JSON into a small stats record (runs in worker processes)."""
+    st = os.stat(filepath)
+    record = {
+        "file": os.path.basename(filepath),
+        "mtime": st.st_mtime,
+        "size": st.st_size,
+    }
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        record["error"] = str(e)
+        return record
+
+    if not isinstance(data, dict):
+        record["error"] = "not an article object"
+        return record
+
+    comments = data.get("comments", [])
+    if not isinstance(comments, list):
+        comments = []
+
+    total_comments, max_depth = count_comments(comments)
+    record.update({
+        "url": data.get("url", "UNKNOWN_URL"),
+        "category": data.get("category", "UNKNOWN_CATEGORY"),
+        "date": data.get("date"),
+        "comments": total_comments,
+        "depth": max_depth,
+    })
+    return record
+
+
+def chunk_stats(filepaths):
+    return [article_stats(filepath) for filepath in filepaths]
+
+
+# ---------------------------
+# ✅ STATS INDEX
+# ---------------------------
+def load_index(index_path):
+    index = {}
+    if not os.path.exists(index_path):
+        return index
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            index[record["file"]] = record
+    return index
+
+
+def save_index(index_path, records):
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, index_path)
+
+
+def iter_stats(data_dir, index, workers=None):
+    """
+    Yield a stats record for every article JSON in data_dir.
+
+    Files whose size and mtime match the index are served from it; the
+    rest are parsed in a process pool in chunks, each chunk streamed back
+    as soon as it finishes (not in submission order).
+    """
+    stale = []
+    for entry in os.scandir(data_dir):
+        if not entry.name.endswith(".json") or not entry.is_file() or entry.name == CATEGORIES_FILENAME:
             continue
+        cached = index.get(entry.name)
+        st = entry.stat()
+        if cached and cached["mtime"] == st.st_mtime and cached["size"] == st.st_size:
+            yield cached
+        else:
+            stale.append(entry.path)
+
+    if not stale:
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(chunk_stats, stale[i:i + CHUNK_SIZE])
+            for i in range(0, len(stale), CHUNK_SIZE)
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+# ---------------------------
+# ✅ FILTERS
+# ---------------------------
+def matches(record, args):
+    if "error" in record:
+        return False
+    if record["comments"] <= args.threshold:
+        return False
+    if args.min_depth and record["depth"] < args.min_depth:
+        return False
+    if args.category and record["category"] not in args.category:
+        return False
+    day = (record.get("date") or "")[:10]
+    if args.date_from and (not day or day < args.date_from):
+        return False
+    if args.date_to and (not day or day > args.date_to):
+        return False
+    return True
+
+
+# ---------------------------
+# ✅ CLI MAIN
+# ---------------------------
+def parse_args():
+    parser = argparse.ArgumentParser(description="Comment count / depth analyzer over crawled articles")
+
+    parser.add_argument(
+        "--data_dir",
+        type=str,
+        default=DATA_DIR,
+        help="Directory of crawled article JSON files"
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=int,
+        default=COMMENT_THRESHOLD,
+        help="Report articles with more than this many comments"
+    )
+
+    parser.add_argument(
+        "--min_depth",
+        type=int,
+        default=None,
+        help="Only report articles whose reply threads are at least this deep"
+    )
+
+    parser.add_argument(
+        "--category",
+        action="append",
+        default=None,
+        help="Only report this category (repeatable)"
+    )
+
+    parser.add_argument(
+        "--date_from",
+        type=str,
+        default=None,
+        help="Only report articles published on or after this date (YYYY-MM-DD)"
+    )
+
+    parser.add_argument(
+        "--date_to",
+        type=str,
+        default=None,
+        help="Only report articles published on or before this date (YYYY-MM-DD)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for parsing (default: CPU count)"
+    )
+
+    parser.add_argument(
+        "--index",
+        type=str,
+        default=None,
+        help=f"Stats index path (default: <data_dir>/{INDEX_FILENAME})"
+    )
+
+    parser.add_argument(
+        "--rebuild_index",
+        action="store_true",
+        help="Ignore the existing stats index and reparse every file"
+    )
+
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Print matches as JSON lines instead of text"
+    )
+
+    return parser.parse_args()
 
-        filepath = os.path.join(DATA_DIR, filename)
 
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            print(f"[ERROR] Failed to read {filename}: {e}")
+def main():
+    args = parse_args()
+    index_path = args.index or os.path.join(args.data_dir, INDEX_FILENAME)
+    index = {} if args.rebuild_index else load_index(index_path)
+
+    records = []
+    matched = 0
+    for record in iter_stats(args.data_dir, index, workers=args.workers):
+        records.append(record)
+        if "error" in record:
+            print(f"[ERROR] Failed to read {record['file']}: {record['error']}", file=sys.stderr)
             continue
-
-        comments = data.get("comments", [])
-        if not isinstance(comments, list):
+        if not matches(record, args):
             continue
 
-        total_comments, max_depth = count_comments_recursive(comments)
-
-        if total_comments > COMMENT_THRESHOLD:
-            url = data.get("url", "UNKNOWN_URL")
-            category = data.get("category", "UNKNOWN_CATEGORY")
-
-            print(f"[MATCH] {total_comments} comments | {max_depth} depth | {category} | {url}")
+        matched += 1
+        if args.jsonl:
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+        else:
+            print(
+                f"[MATCH] {record['comments']} comments | {record['depth']} depth | "
+                f"{record['category']} | {record['url']}",
+                flush=True
+            )
+
+    save_index(index_path, records)
+    print(f"[INFO] {matched} matches out of {len(records)} articles", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+"""
+Comment trees without recursion.
+
+Comments are stored as flat CommentNode lists where each node knows its
+parent index and depth. The same structure backs both the crawler (built
+from comment API items) and the analyzers (built from saved article JSON).
+"""
+
+# vote_reactions keys in output order, and the comment API reaction codes they map to.
+VOTE_KEYS = ("like", "love", "wow", "sad", "angry")
+API_REACTION_CODES = ("1", "3", "5", "7", "9")
+
+
+class CommentNode:
+    __slots__ = ("comment_id", "author", "text", "date", "reactions", "parent", "depth", "children")
+
+    def __init__(self, comment_id, author, text, date, reactions, parent, depth):
+        self.comment_id = comment_id
+        self.author = author
+        self.text = text
+        self.date = date
+        self.reactions = reactions
+        self.parent = parent
+        self.depth = depth
+        self.children = []
+
+
+class CommentTree:
+    """Flat list of CommentNode with parent indices; roots are the top-level comments."""
+
+    def __init__(self):
+        self.nodes = []
+        self.roots = []
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _add(self, node):
+        index = len(self.nodes)
+        self.nodes.append(node)
+        if node.parent is None:
+            self.roots.append(index)
+        else:
+            self.nodes[node.parent].children.append(index)
+        if node.depth > self.max_depth:
+            self.max_depth = node.depth
+        return index
+
+    # ---------------------------
+    # Builders
+    # ---------------------------
+    @classmethod
+    def from_api_items(cls, items, tree=None):
+        """Build (or extend) a tree from comment API items with nested child_comments."""
+        if tree is None:
+            tree = cls()
+        stack = [(item, None, 1) for item in reversed(items)]
+        while stack:
+            item, parent, depth = stack.pop()
+            reactions = item.get("reactions") or {}
+            index = tree._add(CommentNode(
+                item.get("id"),
+                item.get("sender_fullname"),
+                item.get("content"),
+                item.get("published_date"),
+                tuple(reactions.get(code, 0) for code in API_REACTION_CODES),
+                parent,
+                depth
+            ))
+            children = item.get("child_comments") or []
+            stack.extend((child, index, depth + 1) for child in reversed(children))
+        return tree
+
+    @classmethod
+    def from_json(cls, comments, tree=None):
+        """Build (or extend) a tree from the saved article JSON `comments` list."""
+        if tree is None:
+            tree = cls()
+        stack = [(c, None, 1) for c in reversed(comments)]
+        while stack:
+            comment, parent, depth = stack.pop()
+            if not isinstance(comment, dict):
+                continue
+            votes = comment.get("vote_reactions") or {}
+            index = tree._add(CommentNode(
+                comment.get("commentId"),
+                comment.get("author"),
+                comment.get("text"),
+                comment.get("date"),
+                tuple(votes.get(key, 0) for key in VOTE_KEYS),
+                parent,
+                depth
+            ))
+            replies = comment.get("replies")
+            if isinstance(replies, list):
+                stack.extend((reply, index, depth + 1) for reply in reversed(replies))
+        return tree
+
+    # ---------------------------
+    # Output
+    # ---------------------------
+    def to_json(self, roots=None):
+        """Nested comment dicts in the crawler's article JSON format."""
+        out = []
+        stack = [(index, out) for index in reversed(self.roots if roots is None else roots)]
+        while stack:
+            index, siblings = stack.pop()
+            node = self.nodes[index]
+            replies = []
+            siblings.append({
+                "commentId": node.comment_id,
+                "author": node.author,
+                "text": node.text,
+                "date": node.date,
+                "vote_reactions": dict(zip(VOTE_KEYS, node.reactions)),
+                "replies": replies  # nested child comments
+            })
+            stack.extend((child, replies) for child in reversed(node.children))
+        return out
+
+
+def count_comments(comments):
+    """
+    (total comments, max depth) of a saved `comments` list, in one iterative
+    pass. Depth starts at 1 like check_comments always reported.
+    """
+    total = 0
+    max_depth = 1
+    stack = [(comments, 1)]
+    while stack:
+        level, depth = stack.pop()
+        for comment in level:
+            total += 1
+            if depth > max_depth:
+                max_depth = depth
+            replies = comment.get("replies") if isinstance(comment, dict) else None
+            if isinstance(replies, list) and replies:
+                stack.append((replies, depth + 1))
+    return total, max_depth
@@ -1,55 +1,126 @@
 import argparse
-from request_sender import RequestSender
-from bs4 import BeautifulSoup
-import requests
-from article_crawler import ArticleCrawler
+from article_crawler import ArticleCrawler, DEFAULT_BASE_URL, STREAM_END
+from resource_policy import ResourcePolicy
+from media_downloader import DEFAULT_MEDIA_WORKERS, MediaStage
+from crawl_state import CrawlState, STATUS_DONE, default_state_path
+from html_parser import BACKENDS, get_backend, set_backend
+from retry_policy import DEFAULT_ARTICLE_RETRIES, DEFAULT_MAX_ATTEMPTS, DEFAULT_RETRY_BACKOFF, TRANSIENT, split_failures
+from sharding import DEFAULT_LEASE_SIZE, POLL_INTERVAL, WorkQueue, default_owner, parse_shard, shard_categories
+import async_request_sender
+import http_client
+import http_cache
+import rate_limiter
 import json
 import os
+import queue
+import threading
 import time
 
 
 # ---------------------------
-# ✅ EXTRACT FINISHED ARTICLES
+# ✅ COUNT TOTAL TARGET URLS
 # ---------------------------
-def extract_finished_article_urls(data_dir="data"):
-    urls = set()
+def count_total_urls(categories):
+    total = 0
+    for cat in categories.values():
+        total += len(cat.get("articles", []))
+    return total
 
-    for filename in os.listdir(data_dir):
-        if not filename.endswith(".json"):
-            continue
 
-        filepath = os.path.join(data_dir, filename)
+def count_remaining_urls(categories, finished_urls):
+    """Target URLs not finished yet (Video is never crawled, so it is not counted)."""
+    return sum(
+        1
+        for name, cat in categories.items()
+        if name != "Video"
+        for url in cat.get("articles", [])
+        if url not in finished_urls
+    )
 
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
 
-                # ✅ Case 1: LIST of articles
-                if isinstance(data, list):
-                    for article in data:
-                        if isinstance(article, dict) and "url" in article:
-                            urls.add(article["url"])
+def skipped_urls(state, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """(finished, given_up, waiting) URL sets; only URLs in none of them are crawled now."""
+    given_up, waiting = split_failures(state.failures(), max_attempts)
+    return state.finished_urls(), given_up, waiting
 
-                # ✅ Case 2: Single article DICT
-                elif isinstance(data, dict):
-                    if "url" in data:
-                        urls.add(data["url"])
 
-        except json.JSONDecodeError:
-            print(f"[WARNING] Skipped invalid JSON: {filename}")
+# ---------------------------
+# ✅ SHARED WORK QUEUE CONSUMER
+# ---------------------------
+def crawl_leased(crawler, work_queue, workers=1, lease_size=DEFAULT_LEASE_SIZE, owner=None):
+    """
+    Lease batches from a sharding.WorkQueue and crawl them until no URL is
+    pending or leased by anyone; failures go back to the queue to be
+    retried by whichever process leases them next.
+    """
+    owner = owner or default_owner()
+    state = crawler.state
+    leased = 0
+    while True:
+        batch = work_queue.lease(owner, lease_size)
+        if not batch:
+            wait = work_queue.next_due()
+            if wait is None:
+                break
+            time.sleep(min(wait, POLL_INTERVAL))
+            continue
 
-    print(f"[INFO] Found {len(urls)} finished articles")
-    return list(urls)
+        leased += len(batch)
+        posts = {}
+        for url, category in batch:
+            posts.setdefault(category, {"articles": []})["articles"].append(url)
+        finished = {url for url, _ in batch if state.is_done(url)}
+        try:
+            crawler.crawl_articles(posts, finished, workers=workers)
+        except Exception as e:
+            print(f"[❌ ERROR] Crawl crashed: {e}")
+
+        for url, _ in batch:
+            if url in finished:
+                work_queue.complete(url, owner)
+            else:
+                kind, error = state.failure(url) or (TRANSIENT, "not crawled")
+                work_queue.complete(url, owner, kind, error)
+
+    print(f"[INFO] Leased {leased} URLs as {owner}; queue: {work_queue.counts()}")
 
 
 # ---------------------------
-# ✅ COUNT TOTAL TARGET URLS
+# ✅ STREAMING PRODUCER
 # ---------------------------
-def count_total_urls(categories):
-    total = 0
-    for cat in categories.values():
-        total += len(cat.get("articles", []))
-    return total
+DEFAULT_QUEUE_SIZE = 64
+
+
+def produce_jobs(discover, jobs, finished_urls, workers):
+    """
+    Run `discover(on_urls)` and put every new (category, url) into the
+    bounded `jobs` queue as it is found; put() blocks while the queue is
+    full, so discovery never runs far ahead of the article workers.
+    Always ends with one STREAM_END per worker.
+    """
+    queued = set()
+    # on_urls is called from several discovery threads at once.
+    queued_lock = threading.Lock()
+
+    def on_urls(category, urls):
+        if category == "Video":
+            return
+        for url in urls:
+            with queued_lock:
+                if url in finished_urls or url in queued:
+                    continue
+                queued.add(url)
+            # put() may block on a full queue, so it stays outside the lock.
+            jobs.put((category, url))
+
+    try:
+        discover(on_urls)
+    except Exception as e:
+        print(f"[❌ ERROR] Discovery crashed: {e}")
+    finally:
+        for _ in range(workers):
+            jobs.put(STREAM_END)
+        print(f"[INFO] Discovery finished, {len(queued)} articles streamed to the crawler")
 
 
 # ---------------------------
@@ -85,105 +156,480 @@ def main():
         help="Maximum number of automatic restart attempts"
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of articles crawled concurrently"
+    )
 
-    data_dir = args.data_dir
-    categories_path = args.categories_path
-    headless = args.headless
-    max_restart = args.max_restart
+    parser.add_argument(
+        "--browsers",
+        type=int,
+        default=None,
+        help="Size of the browser page pool (default: same as --workers)"
+    )
 
-    # ---------------------------
-    # ✅ LOAD CATEGORIES
-    # ---------------------------
-    if not os.path.exists(categories_path):
-        print(f"[ERROR] Categories file not found: {categories_path}")
-        return
+    parser.add_argument(
+        "--recycle_after",
+        type=int,
+        default=200,
+        help="Restart a pooled browser after this many navigations"
+    )
 
-    categories = json.load(open(categories_path, "r", encoding="utf-8"))
-    print(f"[INFO] Loaded {len(categories)} categories")
+    parser.add_argument(
+        "--block_types",
+        type=str,
+        default=None,
+        help="Comma-separated Playwright resource types to block (default: image,media,font,stylesheet)"
+    )
 
-    for name, cat in categories.items():
-        print(f"    Category: {name} - {len(cat.get('articles', []))} articles")
+    parser.add_argument(
+        "--allow_domains",
+        type=str,
+        default=None,
+        help="Comma-separated domains the browser may load from (default: any)"
+    )
 
-    total_urls = count_total_urls(categories)
-    print(f"[INFO] Total target articles: {total_urls}")
+    parser.add_argument(
+        "--deny_domains",
+        type=str,
+        default=None,
+        help="Comma-separated domains the browser must not load from (default: known ad/tracker domains)"
+    )
 
-    # ---------------------------
-    # ✅ START BROWSER ONCE
-    # ---------------------------
-    crawler = ArticleCrawler(
-        data_dir=data_dir
+    parser.add_argument(
+        "--no-browser",
+        dest="no_browser",
+        action="store_true",
+        help="Never start Playwright; audio/reactions come from static HTML and the reaction API only"
     )
-    crawler.start_browser(headless=headless)
 
-    restart_count = 0
+    parser.add_argument(
+        "--skip-media",
+        dest="skip_media",
+        action="store_true",
+        help="Only queue images/audio in the crawl state; download them later with --media-only"
+    )
 
-    while restart_count <= max_restart:
-        if restart_count > 0:
-            print(f"\n🔁 Restart attempt {restart_count + 1}/{max_restart + 1}")
+    parser.add_argument(
+        "--media-only",
+        dest="media_only",
+        action="store_true",
+        help="Do not crawl articles; download queued media and update the article JSON"
+    )
 
-        # ✅ Reload finished URLs every round
-        finished_urls = extract_finished_article_urls(data_dir)
+    parser.add_argument(
+        "--reaction_api",
+        type=str,
+        default=None,
+        help="JSON endpoint for article reactions, with {post_id} placeholder (tried before the browser)"
+    )
 
-        remaining = total_urls - len(finished_urls)
-        print(f"[INFO] Remaining URLs: {remaining}")
+    parser.add_argument(
+        "--comment_workers",
+        type=int,
+        default=4,
+        help="Comment API pages fetched concurrently per article"
+    )
 
-        if remaining <= 0:
-            print("[✅ DONE] All articles successfully crawled!")
-            break
+    parser.add_argument(
+        "--media_workers",
+        type=int,
+        default=DEFAULT_MEDIA_WORKERS,
+        help="Images/audio files downloaded concurrently (shared by all article workers)"
+    )
 
-        try:
-            crawler.crawl_articles(categories, finished_urls)
+    parser.add_argument(
+        "--article_retries",
+        type=int,
+        default=DEFAULT_ARTICLE_RETRIES,
+        help="Immediate retries of a failed article (jittered exponential backoff; never for 4xx)"
+    )
 
-        except Exception as e:
-            print(f"[❌ ERROR] Crawl crashed: {e}")
+    parser.add_argument(
+        "--retry_backoff",
+        type=float,
+        default=DEFAULT_RETRY_BACKOFF,
+        help="Base delay in seconds of the retry backoff (doubles per attempt, randomised)"
+    )
 
-        restart_count += 1
-        time.sleep(3)
+    parser.add_argument(
+        "--max_attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help="Attempts per article URL over all runs before it is given up"
+    )
 
-    # ---------------------------
-    # ✅ SHUTDOWN AFTER ALL ATTEMPTS
-    # ---------------------------
-    print("[INFO] Stopping browser...")
-    crawler.stop_browser()
+    parser.add_argument(
+        "--max_comment_pages",
+        type=int,
+        default=None,
+        help="Maximum number of comment pages fetched per article (default: all)"
+    )
 
+    parser.add_argument(
+        "--parser",
+        type=str,
+        default=get_backend(),
+        choices=BACKENDS,
+        help="HTML parser backend (html.parser, lxml or selectolax)"
+    )
 
-def crawl_article_info(categories, save_dir, headless, max_restart):
-    crawler = ArticleCrawler(
-        data_dir=save_dir
+    parser.add_argument(
+        "--state_db",
+        type=str,
+        default=None,
+        help="Crawl-state database used for resume (default: <data_dir>/crawl_state.sqlite3)"
     )
-    crawler.start_browser(headless=headless)
 
-    restart_count = 0
+    parser.add_argument(
+        "--shard",
+        type=str,
+        default=None,
+        help="Crawl only shard i of N (e.g. 0/4): the URLs whose stable hash is i modulo N"
+    )
 
-    while restart_count <= max_restart:
-        if restart_count > 0:
-            print(f"\n🔁 Restart attempt {restart_count + 1}/{max_restart + 1}")
+    parser.add_argument(
+        "--work_queue",
+        type=str,
+        default=None,
+        help="Shared SQLite work queue; processes using the same file lease disjoint batches of URLs"
+    )
 
-        # ✅ Reload finished URLs every round
-        finished_urls = extract_finished_article_urls(save_dir)
+    parser.add_argument(
+        "--lease_size",
+        type=int,
+        default=DEFAULT_LEASE_SIZE,
+        help="URLs leased from --work_queue at a time"
+    )
 
-        total_urls = count_total_urls(categories)
-        remaining = total_urls - len(finished_urls)
-        print(f"[INFO] Remaining URLs: {remaining}")
+    parser.add_argument(
+        "--base_url",
+        type=str,
+        default=DEFAULT_BASE_URL,
+        help="Base website URL, used for the comment API (e.g. http://127.0.0.1:8000 for mock_server.py)"
+    )
 
-        if remaining <= 0:
-            print("[✅ DONE] All articles successfully crawled!")
-            break
+    parser.add_argument(
+        "--pool_size",
+        type=int,
+        default=http_client.DEFAULT_POOL_SIZE,
+        help="Keep-alive connections per host in the shared HTTP pool"
+    )
 
-        try:
-            crawler.crawl_articles(categories, finished_urls)
+    parser.add_argument(
+        "--http_retries",
+        type=int,
+        default=http_client.DEFAULT_RETRIES,
+        help="Transport-level retries for connection errors and 5xx responses"
+    )
 
-        except Exception as e:
-            print(f"[❌ ERROR] Crawl crashed: {e}")
+    parser.add_argument(
+        "--async_engine",
+        action="store_true",
+        help="Send every page, comment and media request through one shared asyncio/httpx event loop instead of the blocking session"
+    )
+
+    parser.add_argument(
+        "--rate_limit",
+        type=float,
+        default=rate_limiter.DEFAULT_RATE,
+        help="Starting request rate per host in requests/second, shared by all workers and adapted to the site's responses (0 = unlimited)"
+    )
+
+    parser.add_argument(
+        "--max_rate",
+        type=float,
+        default=rate_limiter.DEFAULT_MAX_RATE,
+        help="Upper bound for the adaptive per-host rate (set it to --rate_limit for a fixed rate)"
+    )
+
+    parser.add_argument(
+        "--http_cache_dir",
+        type=str,
+        default=None,
+        help="On-disk HTTP cache directory (default: <data_dir>/http_cache)"
+    )
 
-        restart_count += 1
-        time.sleep(3)
+    parser.add_argument(
+        "--no-http-cache",
+        dest="no_http_cache",
+        action="store_true",
+        help="Always fetch pages from the network"
+    )
+
+    parser.add_argument(
+        "--http_cache_mb",
+        type=float,
+        default=http_cache.DEFAULT_CACHE_MB,
+        help="Size limit of the HTTP cache; least recently used pages are evicted"
+    )
+
+    parser.add_argument(
+        "--listing_ttl",
+        type=int,
+        default=http_cache.DEFAULT_LISTING_TTL,
+        help="Seconds a cached homepage/category/timeline page is used without revalidation"
+    )
+
+    parser.add_argument(
+        "--article_ttl",
+        type=int,
+        default=http_cache.DEFAULT_ARTICLE_TTL,
+        help="Seconds a cached article page is used without revalidation"
+    )
+
+    args = parser.parse_args()
+    set_backend(args.parser)
+    http_client.configure(pool_size=args.pool_size, retries=args.http_retries)
+    rate_limiter.configure_limiter(args.rate_limit, max_rate=args.max_rate)
+    if not args.no_http_cache:
+        http_cache.configure_cache(
+            args.http_cache_dir or os.path.join(args.data_dir, "http_cache"),
+            max_mb=args.http_cache_mb,
+            listing_ttl=args.listing_ttl,
+            article_ttl=args.article_ttl
+        )
+    if args.async_engine:
+        async_request_sender.configure_engine(retries=args.http_retries)
+
+    data_dir = args.data_dir
+    categories_path = args.categories_path
+    headless = args.headless
+    max_restart = args.max_restart
+    workers = args.workers
+    browsers = args.browsers or workers
+    recycle_after = args.recycle_after
+    resource_policy = ResourcePolicy.from_strings(args.block_types, args.allow_domains, args.deny_domains)
+
+    # ---------------------------
+    # ✅ LOAD CATEGORIES
+    # ---------------------------
+    if args.media_only:
+        categories = {}
+    else:
+        if not os.path.exists(categories_path):
+            print(f"[ERROR] Categories file not found: {categories_path}")
+            return
+
+        categories = json.load(open(categories_path, "r", encoding="utf-8"))
+        print(f"[INFO] Loaded {len(categories)} categories")
+
+        for name, cat in categories.items():
+            print(f"    Category: {name} - {len(cat.get('articles', []))} articles")
+
+        if args.shard:
+            try:
+                shard_index, shard_count = parse_shard(args.shard)
+            except ValueError as e:
+                print(f"[ERROR] {e}")
+                return
+            categories = shard_categories(categories, shard_index, shard_count)
+            print(f"[INFO] Shard {shard_index}/{shard_count}")
+
+        if args.shard or args.work_queue:
+            # The shard's own copy, unioned again by merge_shards.py.
+            shard_categories_path = os.path.join(data_dir, "categories.json")
+            if os.path.abspath(shard_categories_path) != os.path.abspath(categories_path):
+                os.makedirs(data_dir, exist_ok=True)
+                with open(shard_categories_path, "w", encoding="utf-8") as f:
+                    json.dump(categories, f, indent=2, ensure_ascii=False)
+
+        total_urls = count_total_urls(categories)
+        print(f"[INFO] Total target articles: {total_urls}")
+
+    work_queue = None
+    if args.work_queue and not args.media_only:
+        work_queue = WorkQueue(args.work_queue, max_attempts=args.max_attempts)
+        print(f"[INFO] Added {work_queue.add(categories)} URLs to {args.work_queue}; queue: {work_queue.counts()}")
+
+    crawl_article_info(
+        categories=categories,
+        save_dir=data_dir,
+        headless=headless,
+        max_restart=max_restart,
+        workers=workers,
+        browsers=browsers,
+        recycle_after=recycle_after,
+        resource_policy=resource_policy,
+        state_db=args.state_db,
+        use_browser=not args.no_browser,
+        reaction_api_url=args.reaction_api,
+        comment_workers=args.comment_workers,
+        media_workers=args.media_workers,
+        max_comment_pages=args.max_comment_pages,
+        article_retries=args.article_retries,
+        retry_backoff=args.retry_backoff,
+        max_attempts=args.max_attempts,
+        base_url=args.base_url,
+        skip_media=args.skip_media,
+        media_only=args.media_only,
+        work_queue=work_queue,
+        lease_size=args.lease_size
+    )
+    if work_queue:
+        work_queue.close()
+    if args.async_engine:
+        async_request_sender.configure_engine(False)
+
+
+def crawl_article_info(categories, save_dir, headless, max_restart, workers=1, browsers=None,
+                       recycle_after=200, resource_policy=None, state_db=None, skip_media=False,
+                       media_only=False, discover=None, queue_size=DEFAULT_QUEUE_SIZE,
+                       max_attempts=DEFAULT_MAX_ATTEMPTS, work_queue=None, lease_size=DEFAULT_LEASE_SIZE,
+                       **crawler_options):
+    """
+    `crawler_options` are passed straight to ArticleCrawler (use_browser, comment_workers, ...).
+
+    With `discover`, a callable that fills `categories` and reports URLs
+    through its `on_urls(category, urls)` argument, discovery runs in a
+    producer thread and articles are crawled from a queue of at most
+    `queue_size` URLs while it goes; the restart rounds then retry whatever
+    failed. With a sharding.WorkQueue, `categories` is ignored and batches
+    of `lease_size` URLs are leased from the shared queue instead.
+
+    Media is queued in the crawl state and downloaded by a MediaStage running
+    next to the crawl; `skip_media` only queues it, `media_only` only drains
+    the queue (no article is fetched).
+    """
+    # ---------------------------
+    # ✅ OPEN CRAWL STATE
+    # ---------------------------
+    state = CrawlState(state_db or default_state_path(save_dir))
+    imported = state.import_from_json(save_dir)
+    if imported:
+        print(f"[INFO] Imported {imported} existing articles into {state.path}")
+
+    crawler = ArticleCrawler(
+        data_dir=save_dir,
+        state=state,
+        defer_media=True,
+        max_attempts=max_attempts,
+        **crawler_options
+    )
+    media_stage = MediaStage(state, save_dir, crawler.media)
+
+    if media_only:
+        print(f"[INFO] Media queue: {state.media_queue_counts()}")
+        start_time = time.time()
+        attempted = media_stage.run_until_empty()
+        print(f"[INFO] Processed {attempted} queued media files in {time.time() - start_time:.1f}s")
+        print(f"[INFO] Media: {crawler.media.summary()}")
+        print(f"[INFO] Media queue: {state.media_queue_counts()}")
+        crawler.media.close()
+        state.close()
+        return
+
+    # ---------------------------
+    # ✅ START BROWSER ONCE
+    # ---------------------------
+    if crawler.use_browser:
+        crawler.start_browser(
+            headless=headless,
+            pool_size=browsers or workers,
+            recycle_after=recycle_after,
+            resource_policy=resource_policy
+        )
+    if not skip_media:
+        media_stage.start()
+
+    restart_count = 0
+    start_time = time.time()
+    done_before = state.counts().get(STATUS_DONE, 0)
+
+    if work_queue:
+        crawl_leased(crawler, work_queue, workers=workers, lease_size=lease_size)
+    else:
+        if discover:
+            finished, given_up, waiting = skipped_urls(state, max_attempts)
+            jobs = queue.Queue(maxsize=max(1, queue_size))
+            producer = threading.Thread(
+                target=produce_jobs,
+                args=(discover, jobs, finished | given_up | set(waiting), workers),
+                name="Discovery",
+                daemon=True
+            )
+            producer.start()
+            try:
+                crawler.crawl_stream(jobs, set(), workers=workers)
+            except Exception as e:
+                print(f"[❌ ERROR] Crawl crashed: {e}")
+            # Unblock the producer if the workers stopped early; the restart
+            # rounds below pick up anything dropped here from `categories`.
+            while producer.is_alive():
+                try:
+                    jobs.get(timeout=1)
+                except queue.Empty:
+                    pass
+
+        while restart_count <= max_restart:
+            if restart_count > 0:
+                print(f"\n🔁 Restart attempt {restart_count + 1}/{max_restart + 1}")
+
+            # ✅ Reload finished URLs every round (indexed query, no directory scan);
+            # permanent failures and URLs out of attempts are not retried.
+            finished_urls, given_up, waiting = skipped_urls(state, max_attempts)
+            print(f"[INFO] Found {len(finished_urls)} finished articles")
+
+            remaining = count_remaining_urls(categories, finished_urls | given_up)
+            print(f"[INFO] Remaining URLs: {remaining}")
+            if given_up:
+                print(f"[INFO] Not retrying {len(given_up)} URLs (permanent failures or out of attempts)")
+
+            if remaining <= 0:
+                failed = count_remaining_urls(categories, finished_urls)
+                if failed:
+                    print(f"[✅ DONE] Finished; {failed} articles permanently failed (see crawl state)")
+                else:
+                    print("[✅ DONE] All articles successfully crawled!")
+                break
+
+            skip = finished_urls | given_up | set(waiting)
+            if count_remaining_urls(categories, skip) == 0:
+                # Everything left is backing off: wait for the first one to be due.
+                delay = max(0.0, min(waiting.values()) - time.time())
+                print(f"[INFO] {remaining} URLs backing off, next retry in {delay:.1f}s")
+                time.sleep(delay)
+                restart_count += 1
+                continue
+
+            try:
+                crawler.crawl_articles(categories, skip, workers=workers)
+
+            except Exception as e:
+                print(f"[❌ ERROR] Crawl crashed: {e}")
+
+            restart_count += 1
 
     # ---------------------------
     # ✅ SHUTDOWN AFTER ALL ATTEMPTS
     # ---------------------------
+    elapsed = time.time() - start_time
+    crawled = state.counts().get(STATUS_DONE, 0) - done_before
+    print(f"[INFO] Crawled {crawled} articles in {elapsed:.1f}s ({crawled / elapsed if elapsed else 0:.2f} articles/sec)")
+    failures = state.failure_counts()
+    if failures:
+        print(f"[INFO] Failed articles by cause: {failures}")
+
     print("[INFO] Stopping browser...")
     crawler.stop_browser()
+
+    if not skip_media:
+        print("[INFO] Finishing queued media downloads...")
+        media_stage.stop(drain=True)
+    print(f"[INFO] HTTP pool: {http_client.format_pool_stats()}")
+    limiter = rate_limiter.get_limiter()
+    if limiter:
+        print(f"[INFO] Rate limit: {limiter.summary()}")
+    cache = http_cache.get_cache()
+    if cache:
+        print(f"[INFO] HTTP cache: {cache.summary()}")
+    print(f"[INFO] Media: {crawler.media.summary()}")
+    print(f"[INFO] Media queue: {state.media_queue_counts()}")
+    crawler.media.close()
+    state.close()
+
+
 if __name__ == "__main__":
     main()
@@ -1,11 +1,18 @@
 import argparse
+import calendar
 from bs4 import BeautifulSoup
 from request_sender import RequestSender
-import time
 import json
 import re
 import feedparser
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from html_parser import BACKENDS, get_backend, set_backend
+import async_request_sender
+import http_client
+import rate_limiter
+import http_cache
 
 DISALLOWED = [
     "/tim-kiem.htm",
@@ -37,7 +44,8 @@ def is_valid_article(href: str) -> bool:
 # ✅ 1. FOCUS LIST
 # ---------------------------
 def get_focus_list_urls(soup: BeautifulSoup, BASE_URL):
-    collected = set()
+    # dict as an ordered set: page order (newest first) matters for incremental discovery
+    collected = {}
 
     focus_container = soup.select_one("div.list__focus")
     if not focus_container:
@@ -54,7 +62,7 @@ def get_focus_list_urls(soup: BeautifulSoup, BASE_URL):
         for a in focus_container.select(selector):
             href = a.get("href")
             if is_valid_article(href):
-                collected.add(BASE_URL + href)
+                collected[BASE_URL + href] = None
 
     # print(f"✅ FOCUS extracted: {len(collected)}")
     return list(collected)
@@ -64,7 +72,7 @@ def get_focus_list_urls(soup: BeautifulSoup, BASE_URL):
 # ✅ 2. SUB LIST
 # ---------------------------
 def extract_from_sub(soup, BASE_URL):
-    urls = set()
+    urls = {}
     sub = soup.select_one("div.list__listing-sub")
     if not sub:
         return []
@@ -72,7 +80,7 @@ def extract_from_sub(soup, BASE_URL):
     for a in sub.select("div.box-category-item a[href]"):
         href = a.get("href")
         if is_valid_article(href):
-            urls.add(BASE_URL + href)
+            urls[BASE_URL + href] = None
 
     # print(f"✅ SUB extracted: {len(urls)}")
     return list(urls)
@@ -82,12 +90,12 @@ def extract_from_sub(soup, BASE_URL):
 # ✅ 3. MAIN BLOCK
 # ---------------------------
 def extract_from_main(soup, BASE_URL):
-    urls = set()
+    urls = {}
 
     for a in soup.select("a.box-category-link-title[href]"):
         href = a.get("href")
         if is_valid_article(href):
-            urls.add(BASE_URL + href)
+            urls[BASE_URL + href] = None
 
     # print(f"✅ MAIN extracted: {len(urls)}")
     return list(urls)
@@ -106,10 +114,75 @@ def extract_timeline_id(soup):
     return timeline_id
 
 
+# ---------------------------
+# ✅ 4b. RSS FEED
+# ---------------------------
+def extract_rss_urls(xml, BASE_URL):
+    """
+    Article URLs of a category RSS feed, newest first by pubDate (entries
+    without a parseable date keep feed order, after the dated ones).
+    Links are re-rooted on BASE_URL so they match the HTML-scraped URLs.
+    """
+    entries = []
+    for i, entry in enumerate(feedparser.parse(xml).entries):
+        href = urlparse(entry.get("link", "")).path
+        if not is_valid_article(href):
+            continue
+        published = entry.get("published_parsed")
+        timestamp = calendar.timegm(published) if published else None
+        entries.append((timestamp is None, -(timestamp or 0), i, BASE_URL + href))
+
+    entries.sort()
+    return list(dict.fromkeys(url for *_, url in entries))
+
+
+def collect_rss_articles(request_sender, rss_url, BASE_URL):
+    """URLs from the category feed; [] when the feed is missing or broken."""
+    try:
+        urls = extract_rss_urls(request_sender.fetch_text(rss_url), BASE_URL)
+    except Exception as e:
+        print(f"[WARNING] RSS feed failed ({rss_url}): {e}")
+        return []
+    print(f"📰 RSS: {len(urls)} articles from {rss_url}")
+    return urls
+
+
 # ---------------------------
 # ✅ 5. AJAX TIMELINE
 # ---------------------------
-def crawl_timeline(request_sender, timeline_id, collected, BASE_URL, limit=100):
+def known_run_length(urls, known_urls, run=0, stop_after=None):
+    """
+    Length of the run of consecutive already-known URLs at the end of `urls`
+    (continuing `run` from the previous page), or as soon as it reaches `stop_after`.
+    """
+    for url in urls:
+        run = run + 1 if url in known_urls else 0
+        if stop_after and run >= stop_after:
+            break
+    return run
+
+
+def add_urls(collected, urls, limit, on_urls=None):
+    """
+    Add `urls` to the ordered `collected` dict and pass the new ones that
+    still fit within `limit` to `on_urls`, so callers can start on them
+    before the category is finished.
+    """
+    new = [url for url in dict.fromkeys(urls) if url not in collected]
+    room = max(0, limit - len(collected))
+    collected.update(dict.fromkeys(new))
+    if on_urls and new[:room]:
+        on_urls(new[:room])
+
+
+def crawl_timeline(request_sender, timeline_id, collected, BASE_URL, limit=100,
+                   known_urls=None, stop_after_known=None, known_run=0, on_urls=None):
+    """
+    Page through the category timeline until `limit` URLs are collected or a
+    page adds nothing new. With `stop_after_known`, also stop once that many
+    URLs in a row are in `known_urls` (everything older was seen before).
+    Pacing comes from the shared per-host budget (rate_limiter).
+    """
     page = 2
 
     while len(collected) < limit:
@@ -120,7 +193,7 @@ def crawl_timeline(request_sender, timeline_id, collected, BASE_URL, limit=100):
         new_urls = extract_from_main(soup, BASE_URL)
 
         before = len(collected)
-        collected.update(new_urls)
+        add_urls(collected, new_urls, limit, on_urls)
         after = len(collected)
 
         # print(f"📌 Total: {after} (+{after - before})")
@@ -129,8 +202,13 @@ def crawl_timeline(request_sender, timeline_id, collected, BASE_URL, limit=100):
             print("🛑 No new articles → stopping")
             break
 
+        if stop_after_known:
+            known_run = known_run_length(new_urls, known_urls, known_run, stop_after_known)
+            if known_run >= stop_after_known:
+                print(f"🛑 {known_run} already-known articles in a row → stopping")
+                break
+
         page += 1
-        time.sleep(1.5)
 
     return list(collected)[:limit]
 
@@ -138,33 +216,182 @@ def crawl_timeline(request_sender, timeline_id, collected, BASE_URL, limit=100):
 # ---------------------------
 # ✅ 6. FULL COLLECTOR
 # ---------------------------
-def collect_n_articles(url, BASE_URL, limit=100):
-    request_sender = RequestSender()
-    collected = set()
+def first_page_urls(soup, BASE_URL):
+    """Article URLs of a category page in page order: focus, sub list, main list."""
+    urls = get_focus_list_urls(soup, BASE_URL) + extract_from_sub(soup, BASE_URL) + extract_from_main(soup, BASE_URL)
+    return list(dict.fromkeys(urls))
+
+
+def collect_n_articles(url, BASE_URL, limit=100, request_sender=None, known_urls=None, stop_after_known=None,
+                       rss_url=None, on_urls=None):
+    """
+    Up to `limit` article URLs of one category, newest first.
+
+    Incremental mode: pass the already crawled URLs as `known_urls` and
+    paging stops after `stop_after_known` consecutive known URLs.
+    RSS-first mode: with `rss_url`, the feed is read first and the HTML
+    listing/timeline is only scraped when the feed has fewer than `limit`
+    URLs; both are merged, feed URLs first.
+    `on_urls(urls)` is called with every batch of new URLs as it is found.
+    """
+    request_sender = request_sender or RequestSender()
+    known_urls = known_urls or set()
+    collected = {}
+
+    if rss_url:
+        rss_urls = collect_rss_articles(request_sender, rss_url, BASE_URL)
+        add_urls(collected, rss_urls, limit, on_urls)
+        if len(collected) >= limit:
+            return list(collected)[:limit]
+        if stop_after_known and known_run_length(rss_urls, known_urls, 0, stop_after_known) >= stop_after_known:
+            print(f"🛑 {stop_after_known} already-known articles in a row in RSS → stopping")
+            return list(collected)[:limit]
 
     print(f"🔵 Starting crawl: {url}")
     soup = request_sender.send_request(url=url)
 
-    collected.update(get_focus_list_urls(soup, BASE_URL))
-    collected.update(extract_from_sub(soup, BASE_URL))
-    collected.update(extract_from_main(soup, BASE_URL))
+    page_urls = first_page_urls(soup, BASE_URL)
+    add_urls(collected, page_urls, limit, on_urls)
 
     # print(f"✅ After page 1: {len(collected)}")
 
+    known_run = 0
+    if stop_after_known:
+        known_run = known_run_length(page_urls, known_urls, 0, stop_after_known)
+        if known_run >= stop_after_known:
+            print(f"🛑 {known_run} already-known articles in a row → stopping")
+            return list(collected)[:limit]
+
     timeline_id = extract_timeline_id(soup)
     if not timeline_id:
         print("❌ Timeline ID not found — cannot load more")
         return list(collected)[:limit]
 
-    collected = crawl_timeline(request_sender, timeline_id, collected, BASE_URL, limit)
+    return crawl_timeline(
+        request_sender, timeline_id, collected, BASE_URL, limit,
+        known_urls=known_urls, stop_after_known=stop_after_known, known_run=known_run, on_urls=on_urls
+    )
+
+
+def discover_categories(categories, BASE_URL, limit=100, workers=4, request_sender=None, rss=False,
+                        on_urls=None, **collect_options):
+    """
+    Run collect_n_articles for every category concurrently and store the
+    result in each category's "articles". Requests share the per-host
+    budget, so `workers` only bounds how many categories are in flight.
+    `on_urls(category_name, urls)` is called from the worker threads as
+    pages arrive; `collect_options` go to collect_n_articles.
+    """
+    request_sender = request_sender or RequestSender()
+
+    def collect(name, category):
+        return collect_n_articles(
+            url=category.get('url'),
+            BASE_URL=BASE_URL,
+            limit=limit,
+            request_sender=request_sender,
+            rss_url=category.get('rss') if rss else None,
+            on_urls=(lambda urls: on_urls(name, urls)) if on_urls else None,
+            **collect_options
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="Discovery") as pool:
+        futures = {pool.submit(collect, name, category): name for name, category in categories.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                article_urls = future.result()
+            except Exception as e:
+                print(f"[ERROR] Discovery failed for {name}: {e}")
+                article_urls = []
+            print(f"[INFO] Found {len(article_urls)} articles for {name}")
+            categories[name]['articles'] = article_urls
+
+    return categories
+
+
+# ---------------------------
+# ✅ 6b. ASYNC COLLECTOR (AsyncRequestSender)
+# ---------------------------
+async def crawl_timeline_async(request_sender, timeline_id, collected, BASE_URL, limit=100,
+                               known_urls=None, stop_after_known=None, known_run=0):
+    page = 2
+
+    while len(collected) < limit:
+        url = f"{BASE_URL}/timeline/{timeline_id}/trang-{page}.htm"
+        print(f"🔄 Loading: {url}")
+
+        soup = await request_sender.send_request(url=url)
+        new_urls = extract_from_main(soup, BASE_URL)
+
+        before = len(collected)
+        collected.update(dict.fromkeys(new_urls))
+        after = len(collected)
+
+        if before == after:
+            print("🛑 No new articles → stopping")
+            break
+
+        if stop_after_known:
+            known_run = known_run_length(new_urls, known_urls, known_run, stop_after_known)
+            if known_run >= stop_after_known:
+                print(f"🛑 {known_run} already-known articles in a row → stopping")
+                break
+
+        page += 1
+
     return list(collected)[:limit]
 
 
+async def collect_n_articles_async(request_sender, url, BASE_URL, limit=100, known_urls=None, stop_after_known=None,
+                                   rss_url=None):
+    """Async collect_n_articles; run many categories on one loop with asyncio.gather."""
+    known_urls = known_urls or set()
+    collected = {}
+
+    if rss_url:
+        try:
+            rss_urls = extract_rss_urls(await request_sender.fetch_text(rss_url), BASE_URL)
+        except Exception as e:
+            print(f"[WARNING] RSS feed failed ({rss_url}): {e}")
+            rss_urls = []
+        collected.update(dict.fromkeys(rss_urls))
+        if len(collected) >= limit:
+            return list(collected)[:limit]
+        if stop_after_known and known_run_length(rss_urls, known_urls, 0, stop_after_known) >= stop_after_known:
+            print(f"🛑 {stop_after_known} already-known articles in a row in RSS → stopping")
+            return list(collected)[:limit]
+
+    print(f"🔵 Starting crawl: {url}")
+    soup = await request_sender.send_request(url=url)
+
+    page_urls = first_page_urls(soup, BASE_URL)
+    collected.update(dict.fromkeys(page_urls))
+
+    known_run = 0
+    if stop_after_known:
+        known_run = known_run_length(page_urls, known_urls, 0, stop_after_known)
+        if known_run >= stop_after_known:
+            print(f"🛑 {known_run} already-known articles in a row → stopping")
+            return list(collected)[:limit]
+
+    timeline_id = extract_timeline_id(soup)
+    if not timeline_id:
+        print("❌ Timeline ID not found — cannot load more")
+        return list(collected)[:limit]
+
+    return await crawl_timeline_async(
+        request_sender, timeline_id, collected, BASE_URL, limit,
+        known_urls=known_urls, stop_after_known=stop_after_known, known_run=known_run
+    )
+
+
 # ---------------------------
 # ✅ 7. CATEGORY CRAWLER
 # ---------------------------
-def crawl_categories(url, BASE_URL, categories_list=None, save_path='data/categories.json'):
-    request_sender = RequestSender()
+def crawl_categories(url, BASE_URL, categories_list=None, save_path='data/categories.json', num_categories=None,
+                     request_sender=None):
+    request_sender = request_sender or RequestSender()
     soup = request_sender.send_request(url)
 
     categories = {}
@@ -186,7 +413,10 @@ def crawl_categories(url, BASE_URL, categories_list=None, save_path='data/catego
                 "rss": rss_url
             }
 
-    for category in categories_list:
+            if num_categories is not None and len(categories) >= num_categories:
+                break
+
+    for category in categories_list or []:
         if category not in categories:
             print(f"[WARNING] Category '{category}' not found on the website.")
             
@@ -224,6 +454,35 @@ def main():
         help="Number of articles per category"
     )
 
+    parser.add_argument(
+        "--discovery_workers",
+        type=int,
+        default=4,
+        help="Categories discovered concurrently"
+    )
+
+    parser.add_argument(
+        "--rate_limit",
+        type=float,
+        default=rate_limiter.DEFAULT_RATE,
+        help="Starting request rate per host in requests/second, shared by all workers and adapted to the site's responses (0 = unlimited)"
+    )
+
+    parser.add_argument(
+        "--max_rate",
+        type=float,
+        default=rate_limiter.DEFAULT_MAX_RATE,
+        help="Upper bound for the adaptive per-host rate (set it to --rate_limit for a fixed rate)"
+    )
+
+    parser.add_argument(
+        "--discovery",
+        type=str,
+        default="html",
+        choices=["html", "rss"],
+        help="rss: read each category feed first and scrape HTML/timeline only for more depth"
+    )
+
     parser.add_argument(
         "--base_url",
         type=str,
@@ -231,7 +490,82 @@ def main():
         help="Base website URL"
     )
 
+    parser.add_argument(
+        "--parser",
+        type=str,
+        default=get_backend(),
+        choices=BACKENDS,
+        help="HTML parser backend (html.parser, lxml or selectolax)"
+    )
+
+    parser.add_argument(
+        "--pool_size",
+        type=int,
+        default=http_client.DEFAULT_POOL_SIZE,
+        help="Keep-alive connections per host in the shared HTTP pool"
+    )
+
+    parser.add_argument(
+        "--http_retries",
+        type=int,
+        default=http_client.DEFAULT_RETRIES,
+        help="Transport-level retries for connection errors and 5xx responses"
+    )
+
+    parser.add_argument(
+        "--async_engine",
+        action="store_true",
+        help="Send every page, comment and media request through one shared asyncio/httpx event loop instead of the blocking session"
+    )
+
+    parser.add_argument(
+        "--http_cache_dir",
+        type=str,
+        default=None,
+        help="On-disk HTTP cache directory (default: <save_dir>/http_cache)"
+    )
+
+    parser.add_argument(
+        "--no-http-cache",
+        dest="no_http_cache",
+        action="store_true",
+        help="Always fetch pages from the network"
+    )
+
+    parser.add_argument(
+        "--http_cache_mb",
+        type=float,
+        default=http_cache.DEFAULT_CACHE_MB,
+        help="Size limit of the HTTP cache; least recently used pages are evicted"
+    )
+
+    parser.add_argument(
+        "--listing_ttl",
+        type=int,
+        default=http_cache.DEFAULT_LISTING_TTL,
+        help="Seconds a cached homepage/category/timeline page is used without revalidation"
+    )
+
+    parser.add_argument(
+        "--article_ttl",
+        type=int,
+        default=http_cache.DEFAULT_ARTICLE_TTL,
+        help="Seconds a cached article page is used without revalidation"
+    )
+
     args = parser.parse_args()
+    set_backend(args.parser)
+    http_client.configure(pool_size=args.pool_size, retries=args.http_retries)
+    rate_limiter.configure_limiter(args.rate_limit, max_rate=args.max_rate)
+    if not args.no_http_cache:
+        http_cache.configure_cache(
+            args.http_cache_dir or os.path.join(args.save_dir, "http_cache"),
+            max_mb=args.http_cache_mb,
+            listing_ttl=args.listing_ttl,
+            article_ttl=args.article_ttl
+        )
+    if args.async_engine:
+        async_request_sender.configure_engine(retries=args.http_retries)
 
     save_dir = args.save_dir
     num_categories = args.num_categories
@@ -241,28 +575,36 @@ def main():
     os.makedirs(save_dir, exist_ok=True)
     category_path = os.path.join(save_dir, 'categories.json')
 
+    request_sender = RequestSender()
     categories = crawl_categories(
         url=BASE_URL,
         BASE_URL=BASE_URL,
         num_categories=num_categories,
-        save_path=category_path
+        save_path=category_path,
+        request_sender=request_sender
     )
 
-    for category_name, category in categories.items():
-        url = category.get('url')
-        article_urls = collect_n_articles(
-            url=url,
-            BASE_URL=BASE_URL,
-            limit=limit
-        )
-
-        print(f"[INFO] Found {len(article_urls)} articles for {category_name}")
-        category['articles'] = article_urls
+    discover_categories(
+        categories,
+        BASE_URL=BASE_URL,
+        limit=limit,
+        workers=args.discovery_workers,
+        request_sender=request_sender,
+        rss=args.discovery == "rss"
+    )
 
     with open(category_path, 'w', encoding='utf-8') as f:
         json.dump(categories, f, indent=2, ensure_ascii=False)
 
     print(f"[✅ DONE] Saved output to {category_path}")
+    print(f"[INFO] HTTP pool: {http_client.format_pool_stats()}")
+    if rate_limiter.get_limiter():
+        print(f"[INFO] Rate limit: {rate_limiter.get_limiter().summary()}")
+    cache = http_cache.get_cache()
+    if cache:
+        print(f"[INFO] HTTP cache: {cache.summary()}")
+    if args.async_engine:
+        async_request_sender.configure_engine(False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,397 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+STATE_FILENAME = "crawl_state.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url        TEXT PRIMARY KEY,
+    status     TEXT NOT NULL,
+    post_id    TEXT,
+    category   TEXT,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    error      TEXT,
+    failure_kind    TEXT,
+    next_attempt_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_status ON articles(status);
+CREATE TABLE IF NOT EXISTS media (
+    url        TEXT PRIMARY KEY,
+    sha256     TEXT NOT NULL,
+    path       TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS media_queue (
+    post_id    TEXT NOT NULL,
+    url        TEXT NOT NULL,
+    kind       TEXT NOT NULL,
+    status     TEXT NOT NULL,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    error      TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (post_id, url)
+);
+CREATE INDEX IF NOT EXISTS idx_media_queue_status ON media_queue(status);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns added after the first release, created on open for older files.
+ARTICLE_COLUMNS = {
+    "failure_kind": "TEXT",
+    "next_attempt_at": "REAL",
+}
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_PENDING = "pending"
+
+
+def default_state_path(data_dir):
+    return os.path.join(data_dir, STATE_FILENAME)
+
+
+class CrawlState:
+    """
+    Persistent URL -> status/postId/timestamp/error store for resuming crawls.
+
+    One SQLite file per data directory. Every write is its own transaction,
+    so a crash can lose at most the article being written. Safe to share
+    between threads of one process.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(articles)")}
+        with self.conn:
+            for name, kind in ARTICLE_COLUMNS.items():
+                if name not in columns:
+                    self.conn.execute(f"ALTER TABLE articles ADD COLUMN {name} {kind}")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+    def _upsert(self, url, status, post_id=None, category=None, error=None, attempts=1,
+                failure_kind=None, next_attempt_at=None):
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO articles (url, status, post_id, category, attempts, error,
+                                      failure_kind, next_attempt_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status,
+                    post_id = COALESCE(excluded.post_id, articles.post_id),
+                    category = COALESCE(excluded.category, articles.category),
+                    attempts = articles.attempts + excluded.attempts,
+                    error = excluded.error,
+                    failure_kind = excluded.failure_kind,
+                    next_attempt_at = excluded.next_attempt_at,
+                    updated_at = excluded.updated_at
+                """,
+                (url, status, post_id, category, attempts, error, failure_kind, next_attempt_at, time.time())
+            )
+
+    def mark_done(self, url, post_id, category=None, attempts=1):
+        self._upsert(url, STATUS_DONE, post_id=post_id, category=category, attempts=attempts)
+
+    def mark_failed(self, url, error, category=None, attempts=1, failure_kind=None, next_attempt_at=None):
+        """Record a failure; `attempts` is how many tries this covers, `next_attempt_at` when to try again."""
+        self._upsert(
+            url, STATUS_FAILED, category=category, error=error, attempts=attempts,
+            failure_kind=failure_kind, next_attempt_at=next_attempt_at
+        )
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+    def is_done(self, url):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM articles WHERE url = ? AND status = ?", (url, STATUS_DONE)
+            ).fetchone()
+        return row is not None
+
+    def finished_urls(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url FROM articles WHERE status = ?", (STATUS_DONE,)
+            ).fetchall()
+        return {url for (url,) in rows}
+
+    def attempts(self, url):
+        """Attempts recorded so far for `url` (0 if it was never tried)."""
+        with self._lock:
+            row = self.conn.execute("SELECT attempts FROM articles WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else 0
+
+    def failure(self, url):
+        """(failure_kind, error) of a failed `url`, or None if it is not failed."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT failure_kind, error FROM articles WHERE url = ? AND status = ?",
+                (url, STATUS_FAILED)
+            ).fetchone()
+
+    def failures(self):
+        """(url, failure_kind, attempts, next_attempt_at) of every failed article."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT url, failure_kind, attempts, next_attempt_at FROM articles WHERE status = ?",
+                (STATUS_FAILED,)
+            ).fetchall()
+
+    def failure_counts(self):
+        """{failure_kind: count} of the failed articles."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT COALESCE(failure_kind, 'unknown'), COUNT(*) FROM articles WHERE status = ? "
+                "GROUP BY failure_kind",
+                (STATUS_FAILED,)
+            ).fetchall()
+        return dict(rows)
+
+    def counts(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM articles GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def media_entry(self, url):
+        """(sha256, path, size) of an already downloaded media URL, or None."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT sha256, path, size FROM media WHERE url = ?", (url,)
+            ).fetchone()
+
+    def record_media(self, url, sha256, path, size):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO media (url, sha256, path, size, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (url, sha256, path, size, time.time())
+            )
+
+    # ---------------------------
+    # Deferred media queue
+    # ---------------------------
+    def enqueue_media(self, post_id, items):
+        """Queue (url, kind) pairs of one article; URLs already queued for it are left alone."""
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO media_queue (post_id, url, kind, status, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(post_id, url) DO NOTHING",
+                [(post_id, url, kind, STATUS_PENDING, now) for url, kind in items]
+            )
+
+    def pending_media(self, limit=100, max_attempts=3):
+        """{post_id: [url, ...]} of queued or failed media with attempts left, oldest first."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT post_id, url FROM media_queue WHERE status != ? AND attempts < ? "
+                "ORDER BY updated_at LIMIT ?",
+                (STATUS_DONE, max_attempts, limit)
+            ).fetchall()
+        pending = {}
+        for post_id, url in rows:
+            pending.setdefault(post_id, []).append(url)
+        return pending
+
+    def finish_media(self, post_id, url, error=None):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE media_queue SET status = ?, attempts = attempts + 1, error = ?, updated_at = ? "
+                "WHERE post_id = ? AND url = ?",
+                (STATUS_FAILED if error else STATUS_DONE, error, time.time(), post_id, url)
+            )
+
+    def media_queue_counts(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM media_queue GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    # ---------------------------
+    # Merging shards
+    # ---------------------------
+    def merge_from(self, path, media_root):
+        """
+        Fold another state file (one shard of a crawl) into this one. A done
+        article wins over a failed one, otherwise the newer row wins; media
+        paths are rewritten to live under `media_root`.
+        """
+        with self._lock:
+            self.conn.execute("ATTACH DATABASE ? AS shard", (path,))
+            try:
+                with self.conn:
+                    self.conn.execute(
+                        """
+                        INSERT INTO articles (url, status, post_id, category, attempts, error,
+                                              failure_kind, next_attempt_at, updated_at)
+                        SELECT url, status, post_id, category, attempts, error,
+                               failure_kind, next_attempt_at, updated_at
+                        FROM shard.articles WHERE 1
+                        ON CONFLICT(url) DO UPDATE SET
+                            status = excluded.status,
+                            post_id = COALESCE(excluded.post_id, articles.post_id),
+                            category = COALESCE(excluded.category, articles.category),
+                            attempts = articles.attempts + excluded.attempts,
+                            error = excluded.error,
+                            failure_kind = excluded.failure_kind,
+                            next_attempt_at = excluded.next_attempt_at,
+                            updated_at = excluded.updated_at
+                        WHERE articles.status != ?
+                          AND (excluded.status = ? OR excluded.updated_at > articles.updated_at)
+                        """,
+                        (STATUS_DONE, STATUS_DONE)
+                    )
+                    rows = self.conn.execute("SELECT url, sha256, path, size, updated_at FROM shard.media").fetchall()
+                    self.conn.executemany(
+                        "INSERT INTO media (url, sha256, path, size, updated_at) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(url) DO NOTHING",
+                        [
+                            (url, sha, os.path.join(media_root, sha[:2], os.path.basename(media_path)), size, updated_at)
+                            for url, sha, media_path, size, updated_at in rows
+                        ]
+                    )
+                    self.conn.execute(
+                        """
+                        INSERT INTO media_queue (post_id, url, kind, status, attempts, error, updated_at)
+                        SELECT post_id, url, kind, status, attempts, error, updated_at
+                        FROM shard.media_queue WHERE 1
+                        ON CONFLICT(post_id, url) DO UPDATE SET
+                            status = excluded.status,
+                            attempts = excluded.attempts,
+                            error = excluded.error,
+                            updated_at = excluded.updated_at
+                        WHERE media_queue.status != ?
+                        """,
+                        (STATUS_DONE,)
+                    )
+            finally:
+                self.conn.execute("DETACH DATABASE shard")
+
+    # ---------------------------
+    # One-time import
+    # ---------------------------
+    def import_from_json(self, data_dir, force=False):
+        """
+        Mark every article JSON already in data_dir as done. Runs once per
+        state file unless `force` is set; returns the number of URLs imported.
+        """
+        if not force and self.get_meta("json_imported"):
+            return 0
+
+        rows = []
+        now = time.time()
+        for entry in os.scandir(data_dir):
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                print(f"[WARNING] Skipped invalid JSON: {entry.name}")
+                continue
+
+            articles = data if isinstance(data, list) else [data]
+            for article in articles:
+                if isinstance(article, dict) and "url" in article:
+                    rows.append((
+                        article["url"], STATUS_DONE, article.get("postId"),
+                        article.get("category"), entry.stat().st_mtime
+                    ))
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO articles (url, status, post_id, category, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status,
+                    post_id = excluded.post_id,
+                    category = COALESCE(excluded.category, articles.category)
+                """,
+                rows
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                (str(now),)
+            )
+        return len(rows)
+
+
+# ---------------------------
+# ✅ CLI: import / inspect
+# ---------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Import existing article JSON into the crawl-state DB")
+
+    parser.add_argument(
+        "--data_dir",
+        type=str,
+        default="data",
+        help="Directory where crawled articles are stored"
+    )
+
+    parser.add_argument(
+        "--state_db",
+        type=str,
+        default=None,
+        help=f"Crawl-state database (default: <data_dir>/{STATE_FILENAME})"
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-import even if this database was already imported"
+    )
+
+    args = parser.parse_args()
+
+    state = CrawlState(args.state_db or default_state_path(args.data_dir))
+    imported = state.import_from_json(args.data_dir, force=args.force)
+    print(f"[INFO] Imported {imported} articles")
+    print(f"[INFO] State: {state.counts()}")
+    state.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Pluggable HTML parsing backend.
+
+Every page the crawler reads goes through make_soup(). The extractors only
+use a small slice of the BeautifulSoup API (select, select_one, get,
+has_attr, [], text, get_text), so besides BeautifulSoup with html.parser or
+lxml the crawler can run on selectolax's lexbor engine through LexborNode,
+a thin adapter exposing that same slice.
+
+The backend is chosen with set_backend() (wired to --parser on the CLIs)
+or the TUOITRE_PARSER environment variable; html.parser is the default.
+"""
+import os
+from bs4 import BeautifulSoup
+
+
+BACKENDS = ["html.parser", "lxml", "selectolax"]
+
+_backend = os.environ.get("TUOITRE_PARSER", "html.parser")
+
+
+def set_backend(name):
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}', expected one of {BACKENDS}")
+    _backend = name
+
+
+def get_backend():
+    return _backend
+
+
+def make_soup(text, backend=None):
+    backend = backend or _backend
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborNode(LexborHTMLParser(text))
+    return BeautifulSoup(text, backend)
+
+
+class LexborNode:
+    """BeautifulSoup-compatible view over a selectolax LexborNode (or the parser root)."""
+
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    def select(self, selector):
+        return [LexborNode(n) for n in self.node.css(selector)]
+
+    def select_one(self, selector):
+        n = self.node.css_first(selector)
+        return LexborNode(n) if n is not None else None
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    @property
+    def text(self):
+        return self.node.text()
+
+    def get_text(self, separator="", strip=False):
+        return self.node.text(separator=separator, strip=strip, skip_empty=strip)
+
+    def get(self, key, default=None):
+        attrs = self.node.attributes
+        if key not in attrs:
+            return default
+        value = attrs[key] or ""
+        # BeautifulSoup returns class as a list of names.
+        return value.split() if key == "class" else value
+
+    def has_attr(self, key):
+        return key in self.node.attributes
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __eq__(self, other):
+        return isinstance(other, LexborNode) and self.node.mem_id == other.node.mem_id
+
+    def __hash__(self):
+        return self.node.mem_id
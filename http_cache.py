@@ -0,0 +1,264 @@
+"""
+On-disk HTTP response cache with conditional revalidation.
+
+Responses are stored as files under the cache directory with a SQLite
+index (URL -> file, ETag, Last-Modified, fetch time, size, last access).
+Each URL class has its own TTL: while fresh, the cached body is returned
+without a request; once stale it is revalidated with If-None-Match /
+If-Modified-Since, so an unchanged page costs one 304 instead of a full
+transfer. The least recently used entries are evicted past `max_bytes`.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_CACHE_MB = 500
+DEFAULT_LISTING_TTL = 10 * 60
+DEFAULT_ARTICLE_TTL = 7 * 24 * 3600
+
+# TTL in seconds per URL class; None never expires.
+DEFAULT_TTLS = {
+    "listing": DEFAULT_LISTING_TTL,
+    "article": DEFAULT_ARTICLE_TTL,
+    "other": 0,
+}
+
+ARTICLE_RE = re.compile(r"-\d{6,}\.htm$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url           TEXT PRIMARY KEY,
+    file          TEXT NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    fetched_at    REAL NOT NULL,
+    accessed_at   REAL NOT NULL,
+    size          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at);
+"""
+
+
+def classify(url):
+    """
+    URL class used to pick a TTL: article, listing or other. Media files
+    never come through here; they live in the content-addressed media store.
+    """
+    path = urlparse(url).path.lower()
+    if ARTICLE_RE.search(path):
+        return "article"
+    if path in ("", "/") or path.endswith((".htm", ".html", ".rss")):
+        return "listing"
+    return "other"
+
+
+class HttpCache:
+    """Thread-safe; one instance is shared by every RequestSender and ArticleCrawler."""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024, ttls=None):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            os.path.join(self.cache_dir, "index.sqlite3"), timeout=30, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evicted": 0, "bytes_saved": 0}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ---------------------------
+    # Fetch
+    # ---------------------------
+    def fetch_text(self, session, url, headers=None, timeout=15):
+        """
+        Body of `url` as text, from the cache when fresh or unchanged.
+        Raises requests.HTTPError for error responses, like raise_for_status().
+        """
+        entry, text = self._cached(url)
+        if text is not None:
+            return text
+
+        r = session.get(url, headers=self._conditional_headers(entry, headers), timeout=timeout)
+        if r.status_code == 304 and entry:
+            text = self._revalidated(url, entry)
+            if text is not None:
+                return text
+            # Body file vanished: fetch it again unconditionally.
+            r = session.get(url, headers=headers, timeout=timeout)
+        return self._fetched(url, r)
+
+    async def fetch_text_async(self, client, url, headers=None, timeout=15):
+        """fetch_text over an httpx.AsyncClient; raises httpx.HTTPStatusError for error responses."""
+        entry, text = self._cached(url)
+        if text is not None:
+            return text
+
+        r = await client.get(url, headers=self._conditional_headers(entry, headers), timeout=timeout)
+        if r.status_code == 304 and entry:
+            text = self._revalidated(url, entry)
+            if text is not None:
+                return text
+            r = await client.get(url, headers=headers, timeout=timeout)
+        return self._fetched(url, r)
+
+    def _cached(self, url):
+        """(index entry or None, body if the entry is still fresh else None)."""
+        entry = self._lookup(url)
+        ttl = self.ttls.get(classify(url), 0)
+        now = time.time()
+
+        if entry and (ttl is None or now - entry["fetched_at"] < ttl):
+            text = self._read(entry)
+            if text is not None:
+                self._touch(url, now)
+                self._count("hits", entry["size"])
+                return entry, text
+        return entry, None
+
+    def _conditional_headers(self, entry, headers):
+        request_headers = dict(headers or {})
+        if entry:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+        return request_headers
+
+    def _revalidated(self, url, entry):
+        """Cached body after a 304, or None when its file is gone."""
+        text = self._read(entry)
+        if text is not None:
+            self._touch(url, time.time(), revalidated=True)
+            self._count("revalidated", entry["size"])
+        return text
+
+    def _fetched(self, url, r):
+        """Store a full response (requests or httpx) and return its body."""
+        r.raise_for_status()
+        text = r.text
+        self._count("misses")
+        self._store(url, text, r.headers.get("ETag"), r.headers.get("Last-Modified"), time.time())
+        return text
+
+    # ---------------------------
+    # Storage
+    # ---------------------------
+    def _file_for(self, url):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(digest[:2], digest)
+
+    def _lookup(self, url):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT file, etag, last_modified, fetched_at, size FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return dict(zip(("file", "etag", "last_modified", "fetched_at", "size"), row))
+
+    def _read(self, entry):
+        try:
+            with open(os.path.join(self.cache_dir, entry["file"]), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _touch(self, url, now, revalidated=False):
+        with self._lock, self.conn:
+            if revalidated:
+                self.conn.execute(
+                    "UPDATE entries SET accessed_at = ?, fetched_at = ? WHERE url = ?", (now, now, url)
+                )
+            else:
+                self.conn.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (now, url))
+
+    def _store(self, url, text, etag, last_modified, now):
+        data = text.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        rel = self._file_for(url)
+        path = os.path.join(self.cache_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock, self.conn:
+            old = self.conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (url, file, etag, last_modified, fetched_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, rel, etag, last_modified, now, now, len(data))
+            )
+            self.total_bytes += len(data) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits max_bytes (lock held)."""
+        rows = self.conn.execute("SELECT url, file, size FROM entries ORDER BY accessed_at").fetchall()
+        for url, rel, size in rows:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            try:
+                os.remove(os.path.join(self.cache_dir, rel))
+            except OSError:
+                pass
+            self.total_bytes -= size
+            self.stats["evicted"] += 1
+
+    def _count(self, key, size=0):
+        with self._lock:
+            self.stats[key] += 1
+            self.stats["bytes_saved"] += size
+
+    def summary(self):
+        s = self.stats
+        return (
+            f"{s['hits']} fresh hits, {s['revalidated']} revalidated (304), {s['misses']} fetched, "
+            f"{s['bytes_saved'] / 1e6:.1f} MB not transferred, {s['evicted']} evicted, "
+            f"{self.total_bytes / 1e6:.1f} MB cached"
+        )
+
+
+# ---------------------------
+# Shared instance
+# ---------------------------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def configure_cache(cache_dir=None, max_mb=DEFAULT_CACHE_MB, listing_ttl=DEFAULT_LISTING_TTL,
+                    article_ttl=DEFAULT_ARTICLE_TTL):
+    """Enable the shared cache in `cache_dir`, or disable it when cache_dir is None."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
+        if cache_dir:
+            _cache = HttpCache(
+                cache_dir,
+                max_bytes=int(max_mb * 1024 * 1024),
+                ttls={"listing": listing_ttl, "article": article_ttl}
+            )
+    return _cache
+
+
+def get_cache():
+    """The shared HttpCache, or None when caching is disabled (the default)."""
+    return _cache
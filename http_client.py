@@ -0,0 +1,189 @@
+"""
+Shared HTTP connection pool used by every module.
+
+One requests.Session (keep-alive, per-host pool, transport retries, the
+adaptive rate_limiter budget) is created lazily and reused by
+RequestSender, ArticleCrawler and the category crawlers, so listing,
+timeline, article, comment and media requests to the same host share warm
+TCP/TLS connections. Async code gets the matching httpx client from
+make_async_client (HTTP/2 when the `h2` package exists).
+"""
+import ssl
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rate_limiter import get_limiter
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+# Distinct hosts kept warm at once (tuoitre.vn, id.tuoitre.vn, media CDNs, ...).
+DEFAULT_HOSTS = 10
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# tuoitre's certificate chain fails default verification, so only these
+# hosts skip it; every other host is verified normally. The trailing "/"
+# keeps a prefix like https://tuoitre.vn.example.com from matching.
+INSECURE_HOSTS = ("https://tuoitre.vn/", "https://id.tuoitre.vn/", "https://cdn.tuoitre.vn/")
+
+_settings = {
+    "pool_size": DEFAULT_POOL_SIZE,
+    "retries": DEFAULT_RETRIES,
+    "backoff": DEFAULT_BACKOFF,
+}
+_session = None
+_lock = threading.Lock()
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    Takes a token from the global per-host budget (rate_limiter) before each
+    request and reports the outcome, including the attempts urllib3 retried
+    internally, so the host's rate adapts.
+    """
+
+    def send(self, request, **kwargs):
+        limiter = get_limiter()
+        if not limiter:
+            return super().send(request, **kwargs)
+
+        limiter.acquire(request.url)
+        start = time.monotonic()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.RequestException:
+            limiter.feedback(request.url)
+            raise
+
+        retries = getattr(response.raw, "retries", None)
+        history = retries.history if retries else ()
+        for attempt in history:
+            limiter.feedback(request.url, attempt.status)
+        limiter.feedback(
+            request.url,
+            response.status_code,
+            None if history else time.monotonic() - start,
+            response.headers.get("Retry-After")
+        )
+        return response
+
+
+class TLSAdapter(RateLimitedAdapter):
+    """
+    Adapter with a permissive TLS context (tuoitre's chain fails default
+    verification). Mounted only on INSECURE_HOSTS.
+    """
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        ctx = ssl.create_default_context()
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+        ctx.minimum_version = ssl.TLSVersion.TLSv1_2
+        super().init_poolmanager(connections, maxsize, block=block, ssl_context=ctx, **pool_kwargs)
+
+    def send(self, request, **kwargs):
+        # The session verifies by default; these hosts opt out here only.
+        kwargs["verify"] = False
+        return super().send(request, **kwargs)
+
+
+def make_retry(retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Transport-level retries for idempotent requests, with jittered
+    exponential backoff; the final response is returned, not raised.
+    """
+    return Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        backoff_jitter=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False
+    )
+
+
+def make_session(pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """Build a keep-alive requests.Session with `pool_size` connections per host."""
+    session = requests.Session()
+    retry = make_retry(retries, backoff)
+    adapter = RateLimitedAdapter(pool_connections=DEFAULT_HOSTS, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    insecure = TLSAdapter(pool_connections=len(INSECURE_HOSTS), pool_maxsize=pool_size, max_retries=retry)
+    for prefix in INSECURE_HOSTS:
+        session.mount(prefix, insecure)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+def configure(pool_size=None, retries=None, backoff=None):
+    """Change the shared session settings; the next get_session() builds a new pool."""
+    global _session
+    with _lock:
+        for key, value in (("pool_size", pool_size), ("retries", retries), ("backoff", backoff)):
+            if value is not None:
+                _settings[key] = value
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_session():
+    """The process-wide shared session (thread-safe; created on first use)."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = make_session(**_settings)
+        return _session
+
+
+def pool_stats(session=None):
+    """
+    Connection-reuse metrics of a session's live pools.
+
+    `connections` counts new TCP connections opened, `requests` counts
+    requests sent over them; reuse is the share of requests that did not
+    need a new connection.
+    """
+    session = session or get_session()
+    hosts = {}
+    # One adapter can be mounted on several prefixes; count its pools once.
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}"
+            entry = hosts.setdefault(host, {"connections": 0, "requests": 0})
+            entry["connections"] += pool.num_connections
+            entry["requests"] += pool.num_requests
+
+    connections = sum(h["connections"] for h in hosts.values())
+    sent = sum(h["requests"] for h in hosts.values())
+    return {
+        "connections": connections,
+        "requests": sent,
+        "reuse": 1 - connections / sent if sent else 0.0,
+        "hosts": hosts,
+    }
+
+
+def format_pool_stats(stats=None):
+    stats = stats or pool_stats()
+    return (
+        f"{stats['requests']} requests over {stats['connections']} connections "
+        f"({stats['reuse']:.0%} reused, {len(stats['hosts'])} hosts)"
+    )
+
+
+def http2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -1,5 +1,7 @@
 from crawl_article_info import *
 from crawl_categories import *
+from request_sender import RequestSender
+import async_request_sender
 
 
 def parse_args():
@@ -19,6 +21,13 @@ def parse_args():
         help='JSON list of categories, e.g. \'["Thời sự", "Thể thao"]\''
     )
 
+    parser.add_argument(
+        "--base_url",
+        type=str,
+        default=DEFAULT_BASE_URL,
+        help="Base website URL (e.g. http://127.0.0.1:8000 for mock_server.py)"
+    )
+
     parser.add_argument(
         "--limit",
         type=int,
@@ -26,6 +35,55 @@ def parse_args():
         help="Number of articles per category"
     )
 
+    parser.add_argument(
+        "--discovery",
+        type=str,
+        default="html",
+        choices=["html", "rss"],
+        help="rss: read each category feed first and scrape HTML/timeline only for more depth"
+    )
+
+    parser.add_argument(
+        "--discovery_workers",
+        type=int,
+        default=4,
+        help="Categories discovered concurrently"
+    )
+
+    parser.add_argument(
+        "--rate_limit",
+        type=float,
+        default=rate_limiter.DEFAULT_RATE,
+        help="Starting request rate per host in requests/second, shared by all workers and adapted to the site's responses (0 = unlimited)"
+    )
+
+    parser.add_argument(
+        "--max_rate",
+        type=float,
+        default=rate_limiter.DEFAULT_MAX_RATE,
+        help="Upper bound for the adaptive per-host rate (set it to --rate_limit for a fixed rate)"
+    )
+
+    parser.add_argument(
+        "--stop_after_known",
+        type=int,
+        default=None,
+        help="Incremental discovery: stop paging a category after this many already-crawled URLs in a row"
+    )
+
+    parser.add_argument(
+        "--queue_size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="Discovered URLs waiting for an article worker; discovery pauses while the queue is full"
+    )
+
+    parser.add_argument(
+        "--two_phase",
+        action="store_true",
+        help="Discover every category before crawling any article (no streaming)"
+    )
+
     parser.add_argument(
         "--headless",
         action="store_true",
@@ -39,13 +97,209 @@ def parse_args():
         help="Maximum number of restarts on failure"
     )
 
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of articles crawled concurrently"
+    )
+
+    parser.add_argument(
+        "--browsers",
+        type=int,
+        default=None,
+        help="Size of the browser page pool (default: same as --workers)"
+    )
+
+    parser.add_argument(
+        "--recycle_after",
+        type=int,
+        default=200,
+        help="Restart a pooled browser after this many navigations"
+    )
+
+    parser.add_argument(
+        "--block_types",
+        type=str,
+        default=None,
+        help="Comma-separated Playwright resource types to block (default: image,media,font,stylesheet)"
+    )
+
+    parser.add_argument(
+        "--allow_domains",
+        type=str,
+        default=None,
+        help="Comma-separated domains the browser may load from (default: any)"
+    )
+
+    parser.add_argument(
+        "--deny_domains",
+        type=str,
+        default=None,
+        help="Comma-separated domains the browser must not load from (default: known ad/tracker domains)"
+    )
+
+    parser.add_argument(
+        "--no-browser",
+        dest="no_browser",
+        action="store_true",
+        help="Never start Playwright; audio/reactions come from static HTML and the reaction API only"
+    )
+
+    parser.add_argument(
+        "--skip-media",
+        dest="skip_media",
+        action="store_true",
+        help="Only queue images/audio in the crawl state; download them later with --media-only"
+    )
+
+    parser.add_argument(
+        "--media-only",
+        dest="media_only",
+        action="store_true",
+        help="Skip discovery and article crawling; download queued media and update the article JSON"
+    )
+
+    parser.add_argument(
+        "--reaction_api",
+        type=str,
+        default=None,
+        help="JSON endpoint for article reactions, with {post_id} placeholder (tried before the browser)"
+    )
+
+    parser.add_argument(
+        "--comment_workers",
+        type=int,
+        default=4,
+        help="Comment API pages fetched concurrently per article"
+    )
+
+    parser.add_argument(
+        "--media_workers",
+        type=int,
+        default=DEFAULT_MEDIA_WORKERS,
+        help="Images/audio files downloaded concurrently (shared by all article workers)"
+    )
+
+    parser.add_argument(
+        "--article_retries",
+        type=int,
+        default=DEFAULT_ARTICLE_RETRIES,
+        help="Immediate retries of a failed article (jittered exponential backoff; never for 4xx)"
+    )
+
+    parser.add_argument(
+        "--retry_backoff",
+        type=float,
+        default=DEFAULT_RETRY_BACKOFF,
+        help="Base delay in seconds of the retry backoff (doubles per attempt, randomised)"
+    )
+
+    parser.add_argument(
+        "--max_attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help="Attempts per article URL over all runs before it is given up"
+    )
+
+    parser.add_argument(
+        "--max_comment_pages",
+        type=int,
+        default=None,
+        help="Maximum number of comment pages fetched per article (default: all)"
+    )
+
+    parser.add_argument(
+        "--parser",
+        type=str,
+        default=get_backend(),
+        choices=BACKENDS,
+        help="HTML parser backend (html.parser, lxml or selectolax)"
+    )
+
+    parser.add_argument(
+        "--state_db",
+        type=str,
+        default=None,
+        help="Crawl-state database used for resume (default: <save_dir>/crawl_state.sqlite3)"
+    )
+
+    parser.add_argument(
+        "--pool_size",
+        type=int,
+        default=http_client.DEFAULT_POOL_SIZE,
+        help="Keep-alive connections per host in the shared HTTP pool"
+    )
+
+    parser.add_argument(
+        "--http_retries",
+        type=int,
+        default=http_client.DEFAULT_RETRIES,
+        help="Transport-level retries for connection errors and 5xx responses"
+    )
+
+    parser.add_argument(
+        "--async_engine",
+        action="store_true",
+        help="Send every page, comment and media request through one shared asyncio/httpx event loop instead of the blocking session"
+    )
+
+    parser.add_argument(
+        "--http_cache_dir",
+        type=str,
+        default=None,
+        help="On-disk HTTP cache directory (default: <save_dir>/http_cache)"
+    )
+
+    parser.add_argument(
+        "--no-http-cache",
+        dest="no_http_cache",
+        action="store_true",
+        help="Always fetch pages from the network"
+    )
+
+    parser.add_argument(
+        "--http_cache_mb",
+        type=float,
+        default=http_cache.DEFAULT_CACHE_MB,
+        help="Size limit of the HTTP cache; least recently used pages are evicted"
+    )
+
+    parser.add_argument(
+        "--listing_ttl",
+        type=int,
+        default=http_cache.DEFAULT_LISTING_TTL,
+        help="Seconds a cached homepage/category/timeline page is used without revalidation"
+    )
+
+    parser.add_argument(
+        "--article_ttl",
+        type=int,
+        default=http_cache.DEFAULT_ARTICLE_TTL,
+        help="Seconds a cached article page is used without revalidation"
+    )
+
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
+    set_backend(args.parser)
+    http_client.configure(pool_size=args.pool_size, retries=args.http_retries)
+    rate_limiter.configure_limiter(args.rate_limit, max_rate=args.max_rate)
+    if not args.no_http_cache:
+        http_cache.configure_cache(
+            args.http_cache_dir or os.path.join(args.save_dir, "http_cache"),
+            max_mb=args.http_cache_mb,
+            listing_ttl=args.listing_ttl,
+            article_ttl=args.article_ttl
+        )
+    if args.async_engine:
+        async_request_sender.configure_engine(retries=args.http_retries)
 
     save_dir = args.save_dir
+    base_url = args.base_url.rstrip("/")
+    categories_list = None
     if args.categories_list:
         try:
             categories_list = json.loads(args.categories_list.replace("'", '"'))
@@ -58,53 +312,90 @@ def main():
     limit = args.limit
     headless = args.headless
     max_restart = args.max_restart
+    workers = args.workers
 
     os.makedirs(save_dir, exist_ok=True)
+
+    if args.media_only:
+        crawl_article_info(
+            categories={},
+            save_dir=save_dir,
+            headless=headless,
+            max_restart=max_restart,
+            state_db=args.state_db,
+            use_browser=False,
+            media_workers=args.media_workers,
+            media_only=True
+        )
+        return
     categories_path = os.path.join(save_dir, 'categories.json')
 
+    known_urls = set()
+    if args.stop_after_known:
+        state = CrawlState(args.state_db or default_state_path(save_dir))
+        state.import_from_json(save_dir)
+        known_urls = state.finished_urls()
+        state.close()
+        print(f"[INFO] Incremental discovery against {len(known_urls)} known articles")
+
     print("[INFO] Crawling categories...")
+    request_sender = RequestSender()
     categories = crawl_categories(
-        url=DEFAULT_BASE_URL,
-        BASE_URL=DEFAULT_BASE_URL,
+        url=base_url,
+        BASE_URL=base_url,
         categories_list=categories_list,
-        save_path=categories_path
+        save_path=categories_path,
+        request_sender=request_sender
     )
 
-    for category_name, category in categories.items():
-        url = category.get('url')
-        article_urls = collect_n_articles(
-            url=url,
-            BASE_URL=DEFAULT_BASE_URL,
-            limit=limit
+    def discover(on_urls=None):
+        discover_categories(
+            categories,
+            BASE_URL=base_url,
+            limit=limit,
+            workers=args.discovery_workers,
+            request_sender=request_sender,
+            rss=args.discovery == "rss",
+            known_urls=known_urls,
+            stop_after_known=args.stop_after_known,
+            on_urls=on_urls
         )
 
-        print(f"[INFO] Found {len(article_urls)} articles for {category_name}")
-        category['articles'] = article_urls
-
-    with open(categories_path, 'w', encoding='utf-8') as f:
-        json.dump(categories, f, indent=2, ensure_ascii=False)
-
-    print(f"[✅ DONE] Saved {len(categories)} categories to {categories_path}")
-
-    # else:
-    #     print(f"[INFO] Categories file found: {categories_path}")
-    #     with open(categories_path, 'r', encoding='utf-8') as f:
-    #         categories = json.load(f)
+        with open(categories_path, 'w', encoding='utf-8') as f:
+            json.dump(categories, f, indent=2, ensure_ascii=False)
 
-    # # Load categories
-    # with open(categories_path, 'r', encoding='utf-8') as f:
-    #     categories = json.load(f)
+        print(f"[✅ DONE] Saved {len(categories)} categories to {categories_path}")
+        print(f"[INFO] Total target article URLs: {count_total_urls(categories)}")
 
-    total_urls = count_total_urls(categories)
-    print(f"[INFO] Total target article URLs: {total_urls}")
+    if args.two_phase:
+        discover()
 
     # Crawl article information
     crawl_article_info(
         categories=categories,
         save_dir=save_dir,
         headless=headless,
-        max_restart=max_restart
+        max_restart=max_restart,
+        workers=workers,
+        browsers=args.browsers,
+        recycle_after=args.recycle_after,
+        resource_policy=ResourcePolicy.from_strings(args.block_types, args.allow_domains, args.deny_domains),
+        use_browser=not args.no_browser,
+        reaction_api_url=args.reaction_api,
+        comment_workers=args.comment_workers,
+        media_workers=args.media_workers,
+        max_comment_pages=args.max_comment_pages,
+        article_retries=args.article_retries,
+        retry_backoff=args.retry_backoff,
+        max_attempts=args.max_attempts,
+        state_db=args.state_db,
+        base_url=base_url,
+        skip_media=args.skip_media,
+        discover=None if args.two_phase else discover,
+        queue_size=args.queue_size
     )
+    if args.async_engine:
+        async_request_sender.configure_engine(False)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,300 @@
+"""
+Parallel, streaming media downloads with content-addressed dedup.
+
+Bodies are streamed in chunks to a temp file while being hashed, then
+atomically renamed to <root>/<sha256[:2]>/<sha256><ext>. Identical files
+(logos, banners reused across articles) are therefore stored once, and a
+URL that was already downloaded, in this run or a previous one recorded in
+CrawlState, is not requested again while its file exists.
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from http_client import get_session
+from logger_config import get_logger
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MEDIA_WORKERS = 8
+# Article JSON fields that hold media items, and the queue kind of each.
+MEDIA_FIELDS = {"images": "image", "audio_podcast": "audio"}
+MAX_MEDIA_ATTEMPTS = 3
+
+
+class MediaDownloader:
+    """
+    One bounded thread pool shared by every article worker.
+
+    download_many() blocks until all of its files are done, so callers keep
+    their sequential control flow while downloads run `workers` at a time
+    across the whole crawl. Concurrent requests for the same URL share one
+    download.
+    """
+
+    def __init__(self, root, session=None, workers=DEFAULT_MEDIA_WORKERS, state=None, timeout=20):
+        self.root = str(root)
+        self.session = session or get_session()
+        self.state = state
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Media")
+        self._known = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {"downloaded": 0, "deduplicated": 0, "skipped": 0, "failed": 0, "bytes": 0}
+        self.logger = get_logger("MediaDownloader")
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    def download_many(self, items):
+        """
+        Download every {"url": ...} dict in `items`, setting "local_path" and
+        "sha256" on success. Failed items are left without local_path.
+        """
+        futures = [(item, self.submit(item["url"])) for item in items]
+        for item, future in futures:
+            try:
+                sha, path, _ = future.result()
+            except Exception:
+                self.logger.error(f"Media download failed: {item['url']}", exc_info=True)
+                continue
+            item["local_path"] = path
+            item["sha256"] = sha
+        return items
+
+    def submit(self, url):
+        """Future of (sha256, path, size) for `url`, reusing any in-flight download."""
+        with self._lock:
+            future = self._inflight.get(url)
+            if future is None:
+                future = self.executor.submit(self.download, url)
+                self._inflight[url] = future
+                future.add_done_callback(lambda _, url=url: self._forget(url))
+        return future
+
+    def download(self, url):
+        """Blocking download of one URL; returns (sha256, path, size)."""
+        known = self.lookup(url)
+        if known:
+            self._count("skipped")
+            return known
+
+        tmp_path = None
+        try:
+            with self.session.get(url, stream=True, timeout=self.timeout) as r:
+                r.raise_for_status()
+                os.makedirs(self.root, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+                digest = hashlib.sha256()
+                size = 0
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in r.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+
+                expected = r.headers.get("Content-Length")
+                if expected and r.headers.get("Content-Encoding") is None and int(expected) != size:
+                    raise IOError(f"Truncated body: {size} of {expected} bytes")
+
+                entry = self._store(tmp_path, digest.hexdigest(), size, self.extension(url, r.headers))
+                tmp_path = None
+        except Exception:
+            self._count("failed")
+            raise
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.remember(url, entry)
+        return entry
+
+    def lookup(self, url):
+        """(sha256, path, size) if `url` was downloaded before and the file is still there."""
+        with self._lock:
+            entry = self._known.get(url)
+        if entry is None and self.state:
+            entry = self.state.media_entry(url)
+        if entry and os.path.exists(entry[1]):
+            return tuple(entry)
+        return None
+
+    def remember(self, url, entry):
+        with self._lock:
+            self._known[url] = entry
+        if self.state:
+            self.state.record_media(url, *entry)
+
+    # ---------------------------
+    # Helpers
+    # ---------------------------
+    def path_for(self, sha, ext):
+        return os.path.join(self.root, sha[:2], sha + ext)
+
+    def extension(self, url, headers=None):
+        ext = os.path.splitext(urlparse(url).path)[1].lower()
+        if ext and len(ext) <= 6 and ext[1:].isalnum():
+            return ext
+        content_type = (headers or {}).get("Content-Type", "").split(";")[0].strip()
+        return mimetypes.guess_extension(content_type) or ""
+
+    def _store(self, tmp_path, sha, size, ext):
+        path = self.path_for(sha, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            self._count("deduplicated")
+        else:
+            os.replace(tmp_path, path)
+            self._count("downloaded", size)
+        return sha, path, size
+
+    def store_file(self, tmp_path, url, headers=None):
+        """Hash an already written temp file into the store (used by the async downloader)."""
+        digest = hashlib.sha256()
+        size = 0
+        with open(tmp_path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        entry = self._store(tmp_path, digest.hexdigest(), size, self.extension(url, headers))
+        self.remember(url, entry)
+        return entry
+
+    def _forget(self, url):
+        with self._lock:
+            self._inflight.pop(url, None)
+
+    def _count(self, key, size=0):
+        with self._lock:
+            self.stats[key] += 1
+            self.stats["bytes"] += size
+
+    def summary(self):
+        s = self.stats
+        return (
+            f"{s['downloaded']} downloaded ({s['bytes'] / 1e6:.1f} MB), {s['deduplicated']} deduplicated, "
+            f"{s['skipped']} already present, {s['failed']} failed"
+        )
+
+
+def media_items(post_data):
+    """(url, kind) pairs of every media item in an article dict."""
+    return [
+        (item["url"], kind)
+        for field, kind in MEDIA_FIELDS.items()
+        for item in post_data.get(field) or []
+        if item.get("url")
+    ]
+
+
+class MediaStage:
+    """
+    Drains the CrawlState media queue, separately from article extraction.
+
+    Runs in a background thread next to the crawl (start/stop) or on its own
+    (run_until_empty, e.g. `main.py --media-only` later or on another
+    machine sharing the data directory). When an article's files are done,
+    its JSON is rewritten with local_path/sha256 on each media item.
+    """
+
+    def __init__(self, state, data_dir, downloader, batch_size=100, max_attempts=MAX_MEDIA_ATTEMPTS,
+                 poll_interval=1.0):
+        self.state = state
+        self.data_dir = str(data_dir)
+        self.downloader = downloader
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._draining = False
+        self._thread = None
+        self.logger = get_logger("MediaStage")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="MediaStage", daemon=True)
+        self._thread.start()
+
+    def stop(self, drain=True):
+        """Stop the background thread; with drain=True it first empties the queue."""
+        if not self._thread:
+            return
+        if not drain:
+            self._stop.set()
+        self._draining = True
+        self._thread.join()
+        self._thread = None
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if self.run_once() == 0:
+                if self._draining:
+                    break
+                self._stop.wait(self.poll_interval)
+
+    def run_until_empty(self):
+        total = 0
+        while True:
+            done = self.run_once()
+            if done == 0:
+                return total
+            total += done
+
+    def run_once(self):
+        """Download one batch of queued media; returns the number of URLs attempted."""
+        pending = self.state.pending_media(limit=self.batch_size, max_attempts=self.max_attempts)
+        futures = [
+            (post_id, url, self.downloader.submit(url))
+            for post_id, urls in pending.items()
+            for url in urls
+        ]
+
+        results = {}
+        for post_id, url, future in futures:
+            try:
+                sha, path, _ = future.result()
+            except Exception as e:
+                self.logger.error(f"Media download failed: {url}", exc_info=True)
+                self.state.finish_media(post_id, url, error=str(e))
+                continue
+            results.setdefault(post_id, {})[url] = (sha, path)
+
+        for post_id, done in results.items():
+            try:
+                self.update_article(post_id, done)
+            except Exception as e:
+                self.logger.error(f"Could not update article {post_id}", exc_info=True)
+                for url in done:
+                    self.state.finish_media(post_id, url, error=str(e))
+                continue
+            for url in done:
+                self.state.finish_media(post_id, url)
+        return len(futures)
+
+    def update_article(self, post_id, done):
+        """Set local_path/sha256 on the article JSON items whose URL finished downloading."""
+        path = os.path.join(self.data_dir, f"{post_id}.json")
+        with open(path, "r", encoding="utf-8") as f:
+            post_data = json.load(f)
+
+        for field in MEDIA_FIELDS:
+            for item in post_data.get(field) or []:
+                entry = done.get(item.get("url"))
+                if entry:
+                    item["sha256"], item["local_path"] = entry
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(post_data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
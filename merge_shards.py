@@ -0,0 +1,169 @@
+"""
+Merge the data directories of a sharded crawl into one.
+
+Each shard (crawl_article_info.py --shard i/N or --work_queue) writes its
+own data directory. This copies every article JSON and media file into
+one output directory, rewrites local_path to the merged media store, folds
+the crawl-state databases together and unions categories.json, so the
+result looks like a single crawl (and can be resumed as one).
+
+    python merge_shards.py --shard_dirs data/shard-0 data/shard-1 --output data
+"""
+import argparse
+import json
+import os
+import shutil
+
+from crawl_state import STATE_FILENAME, CrawlState, default_state_path
+from media_downloader import MEDIA_FIELDS
+
+CATEGORIES_FILENAME = "categories.json"
+
+
+# ---------------------------
+# ✅ 1. FILE HELPERS
+# ---------------------------
+def write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def copy_file(src, dest):
+    """Copy via a temp file so a partly copied file never looks complete."""
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp_path = dest + ".part"
+    shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dest)
+
+
+# ---------------------------
+# ✅ 2. MEDIA
+# ---------------------------
+def merge_media(shard_dir, output):
+    """Copy the shard's content-addressed media files that the output does not have yet."""
+    src_root = os.path.join(shard_dir, "media")
+    copied = 0
+    for dirpath, _, filenames in os.walk(src_root):
+        for name in filenames:
+            if name.endswith(".part"):
+                continue
+            src = os.path.join(dirpath, name)
+            dest = os.path.join(output, "media", os.path.relpath(src, src_root))
+            # Same name means same sha256, so an existing file is identical.
+            if not os.path.exists(dest):
+                copy_file(src, dest)
+                copied += 1
+    return copied
+
+
+def relocate_media(post_data, media_root):
+    """Point local_path of every downloaded image/audio at the merged media store."""
+    for field in MEDIA_FIELDS:
+        for item in post_data.get(field) or []:
+            if isinstance(item, dict) and item.get("sha256") and item.get("local_path"):
+                name = os.path.basename(item["local_path"])
+                item["local_path"] = os.path.join(media_root, item["sha256"][:2], name)
+
+
+# ---------------------------
+# ✅ 3. ARTICLES
+# ---------------------------
+def merge_articles(shard_dir, output, media_root):
+    """Copy article JSON files; if two shards have the same article, the newer file wins."""
+    merged = 0
+    for entry in os.scandir(shard_dir):
+        if not entry.is_file() or not entry.name.endswith(".json") or entry.name == CATEGORIES_FILENAME:
+            continue
+        dest = os.path.join(output, entry.name)
+        if os.path.exists(dest) and os.path.getmtime(dest) >= entry.stat().st_mtime:
+            continue
+        try:
+            with open(entry.path, "r", encoding="utf-8") as f:
+                post_data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            print(f"[WARNING] Skipped invalid JSON: {entry.path}")
+            continue
+
+        if isinstance(post_data, dict):
+            relocate_media(post_data, media_root)
+        write_json(dest, post_data)
+        os.utime(dest, (entry.stat().st_atime, entry.stat().st_mtime))
+        merged += 1
+    return merged
+
+
+# ---------------------------
+# ✅ 4. CATEGORIES
+# ---------------------------
+def merge_categories(categories, shard_categories):
+    """Union `shard_categories` into `categories`, keeping article order and dropping duplicates."""
+    for name, category in shard_categories.items():
+        target = categories.setdefault(name, {**category, "articles": []})
+        articles = dict.fromkeys(target["articles"])
+        articles.update(dict.fromkeys(category.get("articles", [])))
+        target["articles"] = list(articles)
+    return categories
+
+
+# ---------------------------
+# ✅ 5. MERGE
+# ---------------------------
+def merge_shards(shard_dirs, output):
+    os.makedirs(output, exist_ok=True)
+    media_root = os.path.join(output, "media")
+    state = CrawlState(default_state_path(output))
+    categories = {}
+
+    for shard_dir in shard_dirs:
+        if os.path.abspath(shard_dir) == os.path.abspath(output):
+            print(f"[WARNING] Skipped {shard_dir}: it is the output directory")
+            continue
+
+        media = merge_media(shard_dir, output)
+        articles = merge_articles(shard_dir, output, media_root)
+
+        state_path = os.path.join(shard_dir, STATE_FILENAME)
+        if os.path.exists(state_path):
+            state.merge_from(state_path, media_root)
+
+        categories_path = os.path.join(shard_dir, CATEGORIES_FILENAME)
+        if os.path.exists(categories_path):
+            with open(categories_path, "r", encoding="utf-8") as f:
+                merge_categories(categories, json.load(f))
+
+        print(f"[INFO] {shard_dir}: {articles} articles, {media} media files")
+
+    if categories:
+        with open(os.path.join(output, CATEGORIES_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(categories, f, indent=2, ensure_ascii=False)
+
+    print(f"[✅ DONE] Merged {len(shard_dirs)} shards into {output}: {state.counts()}")
+    state.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge sharded crawl outputs into one data directory")
+
+    parser.add_argument(
+        "--shard_dirs",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Data directories written by the shards"
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="data",
+        help="Merged data directory"
+    )
+
+    args = parser.parse_args()
+    merge_shards(args.shard_dirs, args.output)
+
+
+if __name__ == "__main__":
+    main()
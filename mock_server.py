@@ -0,0 +1,344 @@
+"""
+Local stand-in for tuoitre.vn for end-to-end throughput testing.
+
+Serves the homepage menu, category pages, /timeline/{id}/trang-{n}.htm,
+article pages, the comment API, RSS feeds and media, all generated
+deterministically from the URL, with configurable latency and error rate:
+
+    python mock_server.py --port 8000 --latency_ms 80 --error_rate 0.02
+    python main.py --base_url http://127.0.0.1:8000 --no-browser --limit 50
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+CATEGORIES = [
+    ("Thời sự", "thoi-su"), ("Thế giới", "the-gioi"), ("Pháp luật", "phap-luat"),
+    ("Kinh doanh", "kinh-doanh"), ("Công nghệ", "cong-nghe"), ("Xe", "xe"),
+    ("Du lịch", "du-lich"), ("Nhịp sống trẻ", "nhip-song-tre"), ("Văn hóa", "van-hoa"),
+    ("Giải trí", "giai-tri"), ("Thể thao", "the-thao"), ("Giáo dục", "giao-duc"),
+    ("Nhà đất", "nha-dat"), ("Sức khỏe", "suc-khoe"), ("Giả thật", "gia-that"),
+]
+
+WORDS = (
+    "người dân thành phố hà nội chính phủ kinh tế thị trường giá vàng học sinh giáo dục "
+    "y tế bệnh viện giao thông dự án đầu tư quốc hội bóng đá đội tuyển việt nam công nghệ"
+).split()
+
+ITEMS_PER_PAGE = 20
+COMMENTS_PER_PAGE = 10
+
+ARTICLE_RE = re.compile(r"^/([a-z0-9-]+)-(\d{8,})\.htm$")
+CATEGORY_RE = re.compile(r"^/([a-z-]+)\.htm$")
+TIMELINE_RE = re.compile(r"^/timeline/(\d+)/trang-(\d+)\.htm$")
+RSS_RE = re.compile(r"^/rss/([a-z-]+)\.rss$")
+
+
+class MockSite:
+    """Deterministic page generator; every response depends only on the URL and the seed."""
+
+    def __init__(self, base_url, categories=len(CATEGORIES), timeline_pages=10,
+                 max_comments=40, image_kb=60, audio_kb=400, seed=0):
+        self.base_url = base_url.rstrip("/")
+        self.categories = CATEGORIES[:categories]
+        self.timeline_pages = timeline_pages
+        self.max_comments = max_comments
+        self.image_kb = image_kb
+        self.audio_kb = audio_kb
+        self.seed = seed
+
+    def rng(self, key):
+        digest = hashlib.sha1(f"{self.seed}:{key}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def sentence(self, rng, n=None):
+        text = " ".join(rng.choice(WORDS) for _ in range(n or rng.randint(8, 24)))
+        return text[0].upper() + text[1:] + "."
+
+    def zone_id(self, index):
+        return 200000 + index
+
+    def category_by_slug(self, slug):
+        for index, (name, s) in enumerate(self.categories):
+            if s == slug:
+                return index, name
+        return None, None
+
+    def article_href(self, zone, page, i):
+        post_id = zone * 100000 + page * 100 + i
+        return f"/bai-viet-so-{page}-{i}-{post_id}.htm", post_id
+
+    # ---------------------------
+    # Pages
+    # ---------------------------
+    def homepage(self):
+        items = "".join(
+            f'<li class="nav-item"><a class="nav-link" href="/{slug}.htm" title="{name}">{name}</a></li>'
+            for name, slug in self.categories
+        )
+        return (
+            '<!DOCTYPE html><html lang="vi"><head><meta charset="utf-8"><title>Tuổi Trẻ Online</title></head>'
+            f'<body><nav><ul class="menu-nav"><li class="nav-item"><a class="nav-link" href="/">Trang chủ</a></li>'
+            f'{items}</ul></nav></body></html>'
+        )
+
+    def box_items(self, zone, page, count=ITEMS_PER_PAGE, start=0):
+        rng = self.rng(f"list:{zone}:{page}")
+        out = []
+        for i in range(start, start + count):
+            href, _ = self.article_href(zone, page, i)
+            out.append(
+                f'<div class="box-category-item"><h3><a class="box-category-link-title" href="{href}">'
+                f'{self.sentence(rng, 10)}</a></h3><p class="box-category-sapo">{self.sentence(rng)}</p></div>'
+            )
+        return "".join(out)
+
+    def category_page(self, index, name):
+        zone = self.zone_id(index)
+        focus = (
+            f'<div class="list__focus"><div class="item-first">{self.box_items(zone, 1, 1)}</div>'
+            f'<div class="item-related">{self.box_items(zone, 1, 3, start=1)}</div>'
+            f'<div class="box-sub">{self.box_items(zone, 1, 4, start=4)}</div></div>'
+        )
+        sub = f'<div class="list__listing-sub">{self.box_items(zone, 1, 4, start=8)}</div>'
+        main = f'<div class="list__listing-main">{self.box_items(zone, 1, ITEMS_PER_PAGE - 12, start=12)}</div>'
+        return (
+            f'<!DOCTYPE html><html lang="vi"><head><meta charset="utf-8"><title>{name}</title></head><body>'
+            f'{focus}{sub}{main}<input type="hidden" id="hdZoneId" value="{zone}"></body></html>'
+        )
+
+    def timeline_page(self, zone, page):
+        if page > self.timeline_pages:
+            return '<div class="box-category-middle"></div>'
+        return f'<div class="box-category-middle">{self.box_items(zone, page)}</div>'
+
+    def article_page(self, slug, post_id):
+        rng = self.rng(f"article:{post_id}")
+        zone = post_id // 100000
+        cat_index = zone - 200000
+        category = self.categories[cat_index][1] if 0 <= cat_index < len(self.categories) else "thoi-su"
+        paragraphs = "".join(f"<p>{self.sentence(rng)} {self.sentence(rng)}</p>" for _ in range(rng.randint(8, 20)))
+        figures = "".join(
+            f'<figure class="VCSortableInPreviewMode"><img src="{self.base_url}/media/img/{post_id}-{i}.jpg" '
+            f'alt="{self.sentence(rng, 6)}"></figure>'
+            for i in range(rng.randint(0, 4))
+        )
+        # Same bytes under a per-article URL, like the site's reused banners.
+        figures += (
+            f'<figure class="VCSortableInPreviewMode"><img src="{self.base_url}/media/img/{post_id}-banner.jpg" '
+            f'alt="Banner"></figure>'
+        )
+        audio = (
+            f'<div class="audioplayer"><audio src="{self.base_url}/media/audio/{post_id}.mp3"></audio></div>'
+            if rng.random() < 0.5 else ""
+        )
+        star, like, love = rng.randint(0, 2000), rng.randint(0, 300), rng.randint(0, 100)
+        return (
+            f'<!DOCTYPE html><html lang="vi"><head><meta charset="utf-8"><title>{slug}</title>'
+            f'<meta property="article:published_time" content="2025-11-{1 + post_id % 28:02d}T08:00:00+07:00"></head><body>'
+            f'<div id="main-detail"><div class="detail-cate"><a href="/{category}.htm">{category}</a></div>'
+            f'<h1 class="detail-title">{self.sentence(rng, 12)}</h1>'
+            f'<div class="author-info"><a href="/tac-gia/mock.htm">MOCK AUTHOR</a></div>{audio}'
+            f'<div class="detail-cmain clearfix"><div class="detail-content afcbc-body">{figures}{paragraphs}</div></div>'
+            f'<div class="sendstarauthor"><div><div><div class="reactinfo"><span>Đánh giá</span>'
+            f'<span><span>{star}</span></span><span><span>{like}</span></span><span><span>{love}</span></span>'
+            f'</div></div></div></div></div></body></html>'
+        )
+
+    def comments(self, post_id, page):
+        rng = self.rng(f"comments:{post_id}")
+        total_roots = rng.randint(0, self.max_comments)
+        first = (page - 1) * COMMENTS_PER_PAGE
+        items = []
+        for i in range(first, min(total_roots, first + COMMENTS_PER_PAGE)):
+            crng = self.rng(f"comment:{post_id}:{i}")
+            items.append({
+                "id": post_id * 1000 + i,
+                "sender_fullname": f"Bạn đọc {i}",
+                "content": self.sentence(crng),
+                "published_date": "2025-11-17T09:00:00",
+                "reactions": {"1": crng.randint(0, 30), "3": crng.randint(0, 10)},
+                "child_comments": [
+                    {"id": post_id * 1000 + 500 + i * 10 + j, "sender_fullname": "Trả lời",
+                     "content": self.sentence(crng), "published_date": "2025-11-17T10:00:00",
+                     "reactions": {}, "child_comments": []}
+                    for j in range(crng.randint(0, 2))
+                ],
+            })
+        return {"Success": True, "TotalCount": total_roots, "Data": json.dumps(items, ensure_ascii=False)}
+
+    def rss(self, index, name):
+        zone = self.zone_id(index)
+        rng = self.rng(f"rss:{zone}")
+        items = "".join(
+            f"<item><title>{self.sentence(rng, 8)}</title><link>{self.base_url}{self.article_href(zone, 1, i)[0]}</link>"
+            f"<pubDate>{formatdate(1763340000 - i * 3600)}</pubDate></item>"
+            for i in range(ITEMS_PER_PAGE)
+        )
+        return (
+            f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>{name}</title>'
+            f'<link>{self.base_url}/{self.categories[index][1]}.htm</link>{items}</channel></rss>'
+        )
+
+
+def make_handler(site, latency_ms, jitter_ms, error_rate, stats, max_rps=None, missing_rate=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            # Content is a pure function of the URL, so the ETag never changes.
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if status == 200 and self.headers.get("If-None-Match") == etag:
+                with stats["lock"]:
+                    stats["not_modified"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if status == 200:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def throttled(self):
+            """True when this request goes over --max_rps in the current second."""
+            second = int(time.time())
+            with stats["lock"]:
+                if stats["window"][0] != second:
+                    stats["window"] = [second, 0]
+                stats["window"][1] += 1
+                if stats["window"][1] <= max_rps:
+                    return False
+                stats["throttled"] += 1
+                return True
+
+        def do_GET(self):
+            with stats["lock"]:
+                stats["requests"] += 1
+            if max_rps and self.throttled():
+                return self.send(429, "Too Many Requests", "text/plain", {"Retry-After": "1"})
+            delay = max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+            if delay:
+                time.sleep(delay)
+            if error_rate and random.random() < error_rate:
+                with stats["lock"]:
+                    stats["errors"] += 1
+                return self.send(503, "Service Unavailable", "text/plain")
+
+            parsed = urlparse(self.path)
+            path = parsed.path
+            query = parse_qs(parsed.query)
+
+            if path in ("/", "/index.htm"):
+                return self.send(200, site.homepage())
+
+            if path == "/api/getlist-comment.api":
+                post_id = int(query.get("objId", ["0"])[0] or 0)
+                page = int(query.get("pageindex", ["1"])[0] or 1)
+                return self.send(200, json.dumps(site.comments(post_id, page)), "application/json")
+
+            m = TIMELINE_RE.match(path)
+            if m:
+                return self.send(200, site.timeline_page(int(m.group(1)), int(m.group(2))))
+
+            m = RSS_RE.match(path)
+            if m:
+                index, name = site.category_by_slug(m.group(1))
+                if index is not None:
+                    return self.send(200, site.rss(index, name), "application/rss+xml; charset=utf-8")
+
+            if path.startswith("/media/"):
+                size = (site.audio_kb if path.endswith(".mp3") else site.image_kb) * 1024
+                content_type = "audio/mpeg" if path.endswith(".mp3") else "image/jpeg"
+                key = "banner" if path.endswith("-banner.jpg") else path
+                return self.send(200, site.rng(key).randbytes(size), content_type)
+
+            m = ARTICLE_RE.match(path)
+            if m:
+                # Dead links are chosen per article, so every retry sees the same 404.
+                if missing_rate and site.rng(path).random() < missing_rate:
+                    return self.send(404, "Not Found", "text/plain")
+                return self.send(200, site.article_page(m.group(1), int(m.group(2))))
+
+            m = CATEGORY_RE.match(path)
+            if m:
+                index, name = site.category_by_slug(m.group(1))
+                if index is not None:
+                    return self.send(200, site.category_page(index, name))
+
+            return self.send(404, "Not Found", "text/plain")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock tuoitre.vn server")
+
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--latency_ms", type=float, default=50, help="Mean added latency per response")
+    parser.add_argument("--jitter_ms", type=float, default=20, help="Uniform +/- jitter on the latency")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--max_rps", type=int, default=None, help="Answer 429 (Retry-After: 1) above this many requests per second")
+    parser.add_argument("--missing_rate", type=float, default=0.0, help="Fraction of article links that always 404")
+    parser.add_argument("--categories", type=int, default=len(CATEGORIES), help="Number of categories in the menu")
+    parser.add_argument("--timeline_pages", type=int, default=10, help="Timeline pages per category before it runs dry")
+    parser.add_argument("--max_comments", type=int, default=40, help="Maximum top-level comments per article")
+    parser.add_argument("--image_kb", type=int, default=60, help="Size of every served image")
+    parser.add_argument("--audio_kb", type=int, default=400, help="Size of every served audio file")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for generated content")
+
+    args = parser.parse_args()
+
+    base_url = f"http://{args.host}:{args.port}"
+    site = MockSite(
+        base_url,
+        categories=args.categories,
+        timeline_pages=args.timeline_pages,
+        max_comments=args.max_comments,
+        image_kb=args.image_kb,
+        audio_kb=args.audio_kb,
+        seed=args.seed
+    )
+    stats = {
+        "requests": 0, "errors": 0, "not_modified": 0, "throttled": 0,
+        "window": [0, 0], "lock": threading.Lock()
+    }
+    server = ThreadingHTTPServer(
+        (args.host, args.port),
+        make_handler(site, args.latency_ms, args.jitter_ms, args.error_rate, stats, args.max_rps, args.missing_rate)
+    )
+    print(f"[INFO] Mock tuoitre.vn serving on {base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(
+            f"[INFO] Served {stats['requests']} requests ({stats['errors']} injected errors, "
+            f"{stats['throttled']} throttled, {stats['not_modified']} not modified)"
+        )
+
+
+if __name__ == "__main__":
+    main()
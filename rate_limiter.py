@@ -0,0 +1,199 @@
+"""
+Global per-host politeness scheduler.
+
+A token bucket per host (tuoitre.vn, id.tuoitre.vn, media CDNs, ...)
+shared by every thread and coroutine in the process. The shared HTTP
+session (http_client), the async httpx transport and the Playwright
+navigations all take a token before a request and report the outcome
+afterwards, so parallel discovery and crawling together never exceed the
+budget for a host, whatever the number of workers.
+
+The rate of each host adapts AIMD-style: every good response adds a
+little (additive increase, up to `max_rate`, after a slow start that
+grows it faster until the first backoff), while a 429/5xx, a
+connection error or a response much slower than the host's usual latency
+cuts it (multiplicative decrease, down to `min_rate`). A Retry-After
+header pauses the host for that long.
+"""
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_RATE = 8.0
+DEFAULT_MIN_RATE = 0.5
+DEFAULT_MAX_RATE = 32.0
+# req/s gained per second of traffic at full pace (each response adds step / rate).
+INCREASE_STEP = 1.0
+# Until a host's first backoff each good response adds this much instead
+# (slow start: the rate grows by ~25% per second).
+SLOW_START_GAIN = 0.25
+DECREASE_FACTOR = 0.5
+# Responses slower than SLOW_LATENCY x the host's usual latency count as congestion.
+SLOW_LATENCY = 3.0
+SLOW_FACTOR = 0.8
+LATENCY_ALPHA = 0.1
+LATENCY_SAMPLES = 10
+# At most one decrease per host per DECREASE_COOLDOWN seconds, so a burst of
+# errors from requests already in flight only counts once.
+DECREASE_COOLDOWN = 1.0
+MAX_RETRY_AFTER = 120
+BACKOFF_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class HostState:
+    """Bucket, current rate and latency baseline of one host."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.slow_start = True
+        self.latency = None
+        self.samples = 0
+        self.responses = 0
+        self.backoffs = 0
+        self.delayed = 0
+        self.waited = 0.0
+
+
+def retry_after_seconds(value):
+    """Seconds from a Retry-After header (delta-seconds form only)."""
+    try:
+        return min(MAX_RETRY_AFTER, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+class HostRateLimiter:
+    def __init__(self, rate=DEFAULT_RATE, burst=None, min_rate=DEFAULT_MIN_RATE, max_rate=DEFAULT_MAX_RATE):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.min_rate = min(min_rate, rate)
+        # max_rate <= rate turns adaptation off (fixed budget).
+        self.max_rate = max(max_rate or rate, rate)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.rate, self.burst)
+        return state
+
+    def _reserve(self, host):
+        """Take a token for `host` if one is available; else return the seconds to wait."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._host(host)
+            if state.paused_until > now:
+                return state.paused_until - now
+            state.tokens = min(self.burst, state.tokens + (now - state.last) * state.rate)
+            state.last = now
+            if state.tokens >= 1:
+                state.tokens -= 1
+                return 0.0
+            return (1 - state.tokens) / state.rate
+
+    def _record(self, host, waited):
+        with self._lock:
+            state = self._host(host)
+            state.delayed += 1
+            state.waited += waited
+
+    def acquire(self, url):
+        """Block until `url`'s host has budget for one more request."""
+        host = urlparse(url).netloc
+        started = None
+        while True:
+            wait = self._reserve(host)
+            if not wait:
+                break
+            started = started or time.monotonic()
+            time.sleep(wait)
+        if started:
+            self._record(host, time.monotonic() - started)
+
+    async def acquire_async(self, url):
+        host = urlparse(url).netloc
+        started = None
+        while True:
+            wait = self._reserve(host)
+            if not wait:
+                break
+            started = started or time.monotonic()
+            await asyncio.sleep(wait)
+        if started:
+            self._record(host, time.monotonic() - started)
+
+    def feedback(self, url, status=None, elapsed=None, retry_after=None):
+        """
+        Adapt `url`'s host to one response: `status` None means the request
+        failed without a response; `elapsed` is the time to the response
+        headers (None to skip the latency check).
+        """
+        host = urlparse(url).netloc
+        now = time.monotonic()
+        with self._lock:
+            state = self._host(host)
+            state.responses += 1
+
+            pause = retry_after_seconds(retry_after) if status in BACKOFF_STATUSES else None
+            if pause:
+                state.paused_until = max(state.paused_until, now + pause)
+
+            if status is None or status in BACKOFF_STATUSES:
+                self._decrease(state, now, DECREASE_FACTOR)
+                return
+
+            slow = (
+                elapsed is not None
+                and state.samples >= LATENCY_SAMPLES
+                and elapsed > SLOW_LATENCY * state.latency
+            )
+            if elapsed is not None:
+                state.latency = elapsed if state.latency is None else (
+                    (1 - LATENCY_ALPHA) * state.latency + LATENCY_ALPHA * elapsed
+                )
+                state.samples += 1
+
+            if slow:
+                self._decrease(state, now, SLOW_FACTOR)
+            elif status < 400:
+                step = SLOW_START_GAIN if state.slow_start else INCREASE_STEP / state.rate
+                state.rate = min(self.max_rate, state.rate + step)
+
+    def _decrease(self, state, now, factor):
+        if now - state.last_decrease < DECREASE_COOLDOWN:
+            return
+        state.last_decrease = now
+        state.slow_start = False
+        state.backoffs += 1
+        state.rate = max(self.min_rate, state.rate * factor)
+
+    def summary(self):
+        if not self._hosts:
+            return f"{self.rate:g} req/s per host, no requests"
+        with self._lock:
+            hosts = "; ".join(
+                f"{host} {state.rate:.1f} req/s, {state.backoffs} backoffs, "
+                f"{state.delayed} requests delayed {state.waited:.1f}s in total"
+                for host, state in sorted(self._hosts.items())
+            )
+        return f"start {self.rate:g} req/s, max {self.max_rate:g}: {hosts}"
+
+
+_limiter = None
+
+
+def configure_limiter(rate=DEFAULT_RATE, burst=None, max_rate=DEFAULT_MAX_RATE):
+    """Set the process-wide budget; rate None or <= 0 disables limiting."""
+    global _limiter
+    _limiter = HostRateLimiter(rate, burst, max_rate=max_rate) if rate and rate > 0 else None
+    return _limiter
+
+
+def get_limiter():
+    return _limiter
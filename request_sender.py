@@ -1,9 +1,13 @@
-from bs4 import BeautifulSoup
-import requests
+from html_parser import make_soup
+from http_client import get_session
+from http_cache import get_cache
+import async_request_sender
 
 class RequestSender:
-    def __init__(self):
-        
+    def __init__(self, session=None):
+        # Shared keep-alive pool by default, so every RequestSender reuses connections.
+        self.session = session or get_session()
+
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
                         "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -13,8 +17,20 @@ class RequestSender:
         }
 
     def send_request(self, url):
-        r = requests.get(url, headers=self.headers, timeout=10)
+        return make_soup(self.fetch_text(url))
+
+    def fetch_text(self, url):
+        """Response body as text (through the HTTP cache when enabled), e.g. for RSS feeds."""
+        engine = async_request_sender.get_engine()
+        if engine:
+            return engine.run(async_request_sender.fetch_text(engine.client, url, headers=self.headers, timeout=10))
+
+        cache = get_cache()
+        if cache:
+            return cache.fetch_text(self.session, url, headers=self.headers, timeout=10)
+
+        r = self.session.get(url, headers=self.headers, timeout=10)
         r.raise_for_status()
-        return BeautifulSoup(r.text, "html.parser")
+        return r.text
 
 
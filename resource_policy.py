@@ -0,0 +1,110 @@
+from urllib.parse import urlparse
+
+
+# Only the <audio> tag and the reactinfo counters are read from the page, so
+# none of these need to be downloaded.
+DEFAULT_BLOCKED_TYPES = ["image", "media", "font", "stylesheet"]
+
+DEFAULT_DENY_DOMAINS = [
+    "googletagmanager.com",
+    "google-analytics.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "facebook.com",
+    "admicro.vn",
+]
+
+# Playwright reports requests aborted with this code as ERR_BLOCKED_BY_CLIENT,
+# which is how ArticleCrawler tells blocked requests from real failures.
+BLOCK_ERROR_CODE = "blockedbyclient"
+BLOCK_ERROR_TEXT = "net::ERR_BLOCKED_BY_CLIENT"
+
+
+def _split(value):
+    if value is None:
+        return None
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def _host_matches(host, domains):
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class ResourcePolicy:
+    """
+    Decides which requests a Playwright context may make.
+
+    A request is aborted when its resource type is in `blocked_types`, when
+    its host is in `deny_domains`, or when `allow_domains` is set and its
+    host is not in it. Domains match themselves and their subdomains.
+    """
+
+    def __init__(self, blocked_types=None, allow_domains=None, deny_domains=None):
+        self.blocked_types = set(DEFAULT_BLOCKED_TYPES if blocked_types is None else blocked_types)
+        self.allow_domains = list(allow_domains) if allow_domains else None
+        self.deny_domains = list(DEFAULT_DENY_DOMAINS if deny_domains is None else deny_domains)
+
+    @classmethod
+    def from_strings(cls, blocked_types=None, allow_domains=None, deny_domains=None):
+        """Build a policy from comma-separated CLI values (None keeps the default)."""
+        return cls(
+            blocked_types=_split(blocked_types),
+            allow_domains=_split(allow_domains),
+            deny_domains=_split(deny_domains)
+        )
+
+    def should_block(self, url, resource_type):
+        if resource_type in self.blocked_types:
+            return True
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            return False
+        host = parsed.hostname or ""
+        if self.allow_domains is not None and not _host_matches(host, self.allow_domains):
+            return True
+        return _host_matches(host, self.deny_domains)
+
+    def handle(self, route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            route.abort(BLOCK_ERROR_CODE)
+        else:
+            route.continue_()
+
+    def install(self, context):
+        context.route("**/*", self.handle)
+
+
+class RequestCounter:
+    """Counts allowed vs blocked requests on one page while attached."""
+
+    def __init__(self, page):
+        self.page = page
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type = {}
+
+    def _on_request(self, request):
+        self.allowed += 1
+
+    def _on_failed(self, request):
+        if request.failure == BLOCK_ERROR_TEXT:
+            self.allowed -= 1
+            self.blocked += 1
+            rtype = request.resource_type
+            self.blocked_by_type[rtype] = self.blocked_by_type.get(rtype, 0) + 1
+
+    def __enter__(self):
+        self.page.on("request", self._on_request)
+        self.page.on("requestfailed", self._on_failed)
+        return self
+
+    def __exit__(self, *exc):
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfailed", self._on_failed)
+
+    def summary(self):
+        by_type = ",".join(f"{k}:{v}" for k, v in sorted(self.blocked_by_type.items()))
+        return f"allowed={self.allowed} blocked={self.blocked}" + (f" ({by_type})" if by_type else "")
@@ -0,0 +1,92 @@
+"""
+Failure classification and retry schedule for article URLs.
+
+Every failed article is put in one of four classes, which decides whether
+and how often it is tried again:
+
+    transient        connection errors, timeouts, 408/429/5xx
+    browser_timeout  Playwright navigation/readiness timeouts
+    parse            the page came back but could not be extracted
+    permanent        other 4xx (404, 410, 403, ...): never retried
+
+Retries wait a jittered exponential backoff ("full jitter": a random delay
+up to base * 2^(attempt-1), capped), both inside one run and, through the
+next_attempt_at column of the crawl state, across runs and restarts.
+"""
+import json
+import random
+import time
+
+import httpx
+import requests
+
+TRANSIENT = "transient"
+BROWSER_TIMEOUT = "browser_timeout"
+PARSE = "parse"
+PERMANENT = "permanent"
+
+# Attempts per URL (over all runs) before it is given up, per failure class.
+CLASS_MAX_ATTEMPTS = {
+    TRANSIENT: 5,
+    BROWSER_TIMEOUT: 3,
+    PARSE: 2,
+    PERMANENT: 1,
+}
+DEFAULT_MAX_ATTEMPTS = 5
+# Extra attempts within one crawl_article call (never for permanent failures).
+DEFAULT_ARTICLE_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 1.0
+MAX_RETRY_DELAY = 60.0
+
+TRANSIENT_STATUSES = frozenset([408, 425, 429, 500, 502, 503, 504])
+PARSE_ERRORS = (ValueError, KeyError, IndexError, AttributeError, TypeError, json.JSONDecodeError)
+
+
+def classify_failure(error):
+    """Failure class of an exception raised while crawling one article."""
+    # Playwright's TimeoutError is matched by module so this file does not
+    # need Playwright installed.
+    if type(error).__name__ == "TimeoutError" and type(error).__module__.startswith("playwright"):
+        return BROWSER_TIMEOUT
+
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is not None and status >= 400:
+        return TRANSIENT if status in TRANSIENT_STATUSES or status >= 500 else PERMANENT
+
+    if isinstance(error, (requests.RequestException, httpx.TransportError, OSError)):
+        return TRANSIENT
+    if isinstance(error, PARSE_ERRORS):
+        return PARSE
+    return TRANSIENT
+
+
+def max_attempts_for(kind, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    return min(CLASS_MAX_ATTEMPTS.get(kind, max_attempts), max_attempts)
+
+
+def should_retry(kind, attempts, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """True while a URL that failed `attempts` times with `kind` has attempts left."""
+    return attempts < max_attempts_for(kind, max_attempts)
+
+
+def backoff_delay(attempt, base=DEFAULT_RETRY_BACKOFF, cap=MAX_RETRY_DELAY):
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def split_failures(failures, max_attempts=DEFAULT_MAX_ATTEMPTS, now=None):
+    """
+    Sort the failed URLs of a CrawlState into those given up (permanent or
+    out of attempts) and those still backing off, as {url: next_attempt_at}.
+    URLs due now are in neither and are simply crawled again.
+    """
+    now = now or time.time()
+    given_up = set()
+    waiting = {}
+    for url, kind, attempts, next_attempt_at in failures:
+        if not should_retry(kind or TRANSIENT, attempts, max_attempts):
+            given_up.add(url)
+        elif next_attempt_at and next_attempt_at > now:
+            waiting[url] = next_attempt_at
+    return given_up, waiting
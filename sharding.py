@@ -0,0 +1,194 @@
+"""
+Splitting one crawl across processes or machines.
+
+Two ways to give each process a disjoint share of the URLs in
+categories.json:
+
+    --shard i/N         static: a URL belongs to shard i when a stable hash
+                        of it (sha1, identical on every host) is i modulo N
+    --work_queue PATH   dynamic: processes lease batches of URLs from one
+                        shared SQLite queue, so fast workers take more and a
+                        crashed worker's lease expires and is picked up again
+
+Each process writes to its own data directory; merge_shards.py combines
+them into one.
+"""
+import hashlib
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from crawl_state import STATUS_DONE, STATUS_FAILED, STATUS_PENDING
+from retry_policy import DEFAULT_MAX_ATTEMPTS, PERMANENT, backoff_delay, should_retry
+
+STATUS_LEASED = "leased"
+DEFAULT_LEASE_SIZE = 20
+# A lease not completed within this time is handed to another worker.
+DEFAULT_LEASE_SECONDS = 900
+POLL_INTERVAL = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work (
+    url          TEXT PRIMARY KEY,
+    category     TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    owner        TEXT,
+    lease_until  REAL,
+    available_at REAL NOT NULL DEFAULT 0,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    error        TEXT,
+    updated_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_work_status ON work(status, available_at);
+"""
+
+
+# ---------------------------
+# ✅ STATIC HASH SHARDS
+# ---------------------------
+def parse_shard(value):
+    """"i/N" -> (i, N), with 0 <= i < N."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {value!r}, expected i/N (e.g. 0/4)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {value!r}, need 0 <= i < N")
+    return index, count
+
+
+def shard_of(url, count):
+    """Stable shard number of `url`; unlike hash() it is the same in every process."""
+    return int(hashlib.sha1(url.encode("utf-8")).hexdigest()[:8], 16) % count
+
+
+def shard_categories(categories, index, count):
+    """Copy of `categories` keeping only the article URLs that belong to shard `index`."""
+    return {
+        name: {**category, "articles": [url for url in category.get("articles", []) if shard_of(url, count) == index]}
+        for name, category in categories.items()
+    }
+
+
+# ---------------------------
+# ✅ SHARED WORK QUEUE
+# ---------------------------
+def default_owner():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    URL queue in one SQLite file shared by every crawl process.
+
+    lease() hands out batches under an exclusive write transaction, so two
+    processes never get the same URL while its lease is live. The file must
+    sit on a filesystem with working locks (local disk, or a network
+    filesystem that supports them).
+    """
+
+    def __init__(self, path, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    @contextmanager
+    def _write(self):
+        """Exclusive write transaction (BEGIN IMMEDIATE), across threads and processes."""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def add(self, categories):
+        """Queue every article URL of `categories` (Video excluded); URLs already queued are left alone."""
+        now = time.time()
+        rows = [
+            (url, name, STATUS_PENDING, now)
+            for name, category in categories.items()
+            if name != "Video"
+            for url in category.get("articles", [])
+        ]
+        with self._write() as conn:
+            cursor = conn.executemany(
+                "INSERT INTO work (url, category, status, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(url) DO NOTHING",
+                rows
+            )
+        return cursor.rowcount
+
+    def lease(self, owner, limit=DEFAULT_LEASE_SIZE, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Take up to `limit` due URLs (or expired leases) for `owner`; returns [(url, category)]."""
+        now = time.time()
+        with self._write() as conn:
+            rows = conn.execute(
+                "SELECT url, category FROM work "
+                "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?) "
+                "ORDER BY available_at, rowid LIMIT ?",
+                (STATUS_PENDING, now, STATUS_LEASED, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE work SET status = ?, owner = ?, lease_until = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE url = ?",
+                [(STATUS_LEASED, owner, now + lease_seconds, now, url) for url, _ in rows]
+            )
+        return rows
+
+    def complete(self, url, owner, failure_kind=None, error=None):
+        """
+        Finish a leased URL: done without `failure_kind`, otherwise back to
+        pending after a backoff, or failed for good once it is permanent or
+        out of attempts. Ignored if the lease has moved to another owner.
+        """
+        now = time.time()
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM work WHERE url = ? AND owner = ? AND status = ?",
+                (url, owner, STATUS_LEASED)
+            ).fetchone()
+            if row is None:
+                return
+            attempts = row[0]
+            if failure_kind is None:
+                status, available_at = STATUS_DONE, 0
+            elif failure_kind != PERMANENT and should_retry(failure_kind, attempts, self.max_attempts):
+                status, available_at = STATUS_PENDING, now + backoff_delay(attempts)
+            else:
+                status, available_at = STATUS_FAILED, 0
+            conn.execute(
+                "UPDATE work SET status = ?, lease_until = NULL, available_at = ?, error = ?, updated_at = ? "
+                "WHERE url = ? AND owner = ?",
+                (status, available_at, error, now, url, owner)
+            )
+
+    def next_due(self):
+        """Seconds until some URL can be leased, or None when nothing is pending or leased."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MIN(CASE WHEN status = ? THEN available_at ELSE lease_until END) FROM work "
+                "WHERE status IN (?, ?)",
+                (STATUS_PENDING, STATUS_PENDING, STATUS_LEASED)
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def counts(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM work GROUP BY status").fetchall()
+        return dict(rows)